@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor, split_page
 from app.core.security import get_current_user, get_current_user_optional
 from app.crud import community as community_crud
 from app.crud import kid as kid_crud
@@ -31,10 +32,24 @@ def get_posts(
     limit: int = Query(20, ge=1, le=100),
     sort_by: str = Query("created_at"),
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (지정 시 page 무시)"),
     current_user: Optional[User] = Depends(get_current_user_optional),
     db: Session = Depends(get_db)
 ):
-    """게시글 목록 조회"""
+    """게시글 목록 조회 (page 오프셋 또는 cursor 키셋 페이지네이션)"""
+    cursor_parser = community_crud.POST_CURSOR_SORTS.get(sort_by)
+    after = None
+    if cursor:
+        try:
+            if cursor_parser is None:
+                raise InvalidCursor(cursor)
+            after = decode_cursor(cursor, cursor_parser, int)
+        except InvalidCursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="잘못된 커서입니다"
+            )
+
     skip = (page - 1) * limit
     posts, total = community_crud.get_posts(
         db,
@@ -42,17 +57,24 @@ def get_posts(
         keyword=keyword,
         author_id=author_id,
         skip=skip,
-        limit=limit,
+        limit=limit + 1,
         sort_by=sort_by,
-        sort_order=sort_order
+        sort_order=sort_order,
+        after=after
     )
+    posts, has_next = split_page(posts, limit)
+
+    next_cursor = None
+    if has_next and cursor_parser is not None:
+        next_cursor = encode_cursor(*community_crud.post_page_key(posts[-1], sort_by))
 
     return PostListResponse(
         posts=[_post_to_brief_response(p, current_user, db) for p in posts],
         total=total,
         page=page,
         limit=limit,
-        has_next=(skip + limit) < total
+        has_next=has_next,
+        next_cursor=next_cursor
     )
 
 
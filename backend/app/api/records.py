@@ -1,10 +1,18 @@
-from datetime import date
-from typing import Optional, List
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Iterator, Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor, split_page
 from app.core.security import get_current_user
 from app.crud import kid as kid_crud
 from app.crud import record as record_crud
@@ -17,11 +25,21 @@ from app.schemas.record import (
     HealthRecordCreate, HealthRecordUpdate,
     DiaperRecordCreate, DiaperRecordUpdate,
     EtcRecordCreate, EtcRecordUpdate,
-    RecordListResponse, RecordWithDetailsResponse, DailySummaryResponse
+    RecordListResponse, RecordWithDetailsResponse, DailySummaryResponse,
+    RecordStatsResponse,
+    BulkRecordRequest, BulkRecordItemResult, BulkRecordResponse,
 )
 
 router = APIRouter(prefix="/kids/{kid_id}/records", tags=["기록"])
 
+# 집계 조회 기본/최대 기간 (일)
+STATS_DEFAULT_DAYS = 30
+STATS_MAX_DAYS = 366
+
+# 내보내기: 서버측 커서로 한 번에 가져와 내보낼 기록 수
+EXPORT_CHUNK_SIZE = 500
+EXPORT_BASE_FIELDS = ("id", "record_type", "record_date", "memo", "image_url", "created_at", "updated_at")
+
 
 def get_kid_or_404(db: Session, kid_id: int, user_id: int):
     """아이 조회 (없으면 404)"""
@@ -45,12 +63,23 @@ def get_records(
     end_date: Optional[date] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (지정 시 page 무시)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """기록 목록 조회"""
+    """기록 목록 조회 (page 오프셋 또는 cursor 키셋 페이지네이션)"""
     get_kid_or_404(db, kid_id, current_user.id)
 
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, date.fromisoformat, datetime.fromisoformat, int)
+        except InvalidCursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="잘못된 커서입니다"
+            )
+
     skip = (page - 1) * limit
     records = record_crud.get_records_by_kid(
         db, kid_id,
@@ -58,15 +87,23 @@ def get_records(
         start_date=start_date,
         end_date=end_date,
         skip=skip,
-        limit=limit
+        limit=limit + 1,
+        after=after
+    )
+    records, has_next = split_page(records, limit)
+    total = record_crud.count_records_by_kid(
+        db, kid_id,
+        record_type=record_type,
+        start_date=start_date,
+        end_date=end_date
     )
-    total = record_crud.count_records_by_kid(db, kid_id, record_type)
 
     return RecordListResponse(
         records=[_record_to_response(r) for r in records],
         total=total,
         page=page,
-        limit=limit
+        limit=limit,
+        next_cursor=encode_cursor(*record_crud.record_page_key(records[-1])) if has_next else None
     )
 
 
@@ -112,6 +149,68 @@ def get_monthly_record_dates(
     }
 
 
+@router.get("/stats", response_model=RecordStatsResponse)
+def get_record_stats(
+    kid_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    bucket: str = Query("day", pattern="^(day|week)$"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """수면/식사/배변 기간별 집계 (차트용, 기본 최근 30일)"""
+    get_kid_or_404(db, kid_id, current_user.id)
+
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=STATS_DEFAULT_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="시작일은 종료일보다 늦을 수 없습니다"
+        )
+    if (end_date - start_date).days >= STATS_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"조회 기간은 최대 {STATS_MAX_DAYS}일입니다"
+        )
+
+    stats = record_crud.get_record_stats(db, kid_id, start_date, end_date, bucket)
+    return RecordStatsResponse(
+        kid_id=kid_id,
+        bucket=bucket,
+        start_date=start_date,
+        end_date=end_date,
+        **stats
+    )
+
+
+@router.get("/export")
+def export_records(
+    kid_id: int,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    record_type: Optional[RecordTypeEnum] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """기록 전체 내보내기 (CSV/NDJSON 스트리밍, 오래된 순)"""
+    get_kid_or_404(db, kid_id, current_user.id)
+
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="시작일은 종료일보다 늦을 수 없습니다"
+        )
+
+    media_type = "text/csv; charset=utf-8" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_stream(kid_id, export_format, record_type, start_date, end_date),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="records_{kid_id}.{export_format}"'}
+    )
+
+
 @router.get("/{record_id}", response_model=RecordWithDetailsResponse)
 def get_record(
     kid_id: int,
@@ -153,6 +252,78 @@ def delete_record(
     return None
 
 
+# =============================================================================
+# 일괄 생성 (오프라인 동기화/외부 앱 가져오기)
+# =============================================================================
+BULK_CREATE_SCHEMAS = {
+    RecordTypeEnum.SLEEP: SleepRecordCreate,
+    RecordTypeEnum.GROWTH: GrowthRecordCreate,
+    RecordTypeEnum.MEAL: MealRecordCreate,
+    RecordTypeEnum.HEALTH: HealthRecordCreate,
+    RecordTypeEnum.DIAPER: DiaperRecordCreate,
+    RecordTypeEnum.ETC: EtcRecordCreate,
+}
+BULK_BASE_FIELDS = ("record_date", "memo", "image_url")
+
+
+@router.post("/bulk", response_model=BulkRecordResponse)
+def bulk_create_records(
+    kid_id: int,
+    body: BulkRecordRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    기록 일괄 생성 (수면/식사/배변/건강/성장/기타 혼합)
+    - 항목마다 기존 생성 스키마로 검증, 실패 항목은 건너뛰고 사유를 결과에 담음
+    - 통과한 항목은 한 트랜잭션으로 테이블별 일괄 INSERT
+    """
+    get_kid_or_404(db, kid_id, current_user.id)
+
+    results: List[BulkRecordItemResult] = []
+    valid = []
+    for index, item in enumerate(body.records):
+        client_id = item.get("client_id")
+        client_id = str(client_id) if client_id is not None else None
+        try:
+            record_type = RecordTypeEnum(item.get("record_type"))
+        except ValueError:
+            results.append(BulkRecordItemResult(
+                index=index, client_id=client_id, success=False,
+                errors=["record_type: 지원하지 않는 기록 종류입니다"]
+            ))
+            continue
+
+        try:
+            record_in = BULK_CREATE_SCHEMAS[record_type].model_validate(item)
+        except ValidationError as exc:
+            results.append(BulkRecordItemResult(
+                index=index, client_id=client_id, record_type=record_type, success=False,
+                errors=[f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in exc.errors()]
+            ))
+            continue
+
+        detail = record_in.model_dump()
+        base = {field: detail.pop(field) for field in BULK_BASE_FIELDS}
+        valid.append((len(results), record_type, base, detail))
+        results.append(BulkRecordItemResult(
+            index=index, client_id=client_id, record_type=record_type, success=True
+        ))
+
+    record_ids = record_crud.bulk_create_records(
+        db, kid_id,
+        [(record_type, base, detail) for _, record_type, base, detail in valid]
+    )
+    for (position, *_), record_id in zip(valid, record_ids):
+        results[position].record_id = record_id
+
+    return BulkRecordResponse(
+        created=len(record_ids),
+        failed=len(results) - len(record_ids),
+        results=results
+    )
+
+
 # =============================================================================
 # 수면 기록
 # =============================================================================
@@ -455,8 +626,22 @@ def update_etc_record(
 # =============================================================================
 # Helper
 # =============================================================================
+# record_type 별 응답에 펼칠 상세 필드
+DETAIL_RESPONSE_FIELDS = {
+    RecordTypeEnum.SLEEP: ("sleep_type", "start_datetime", "end_datetime", "sleep_quality", "duration_hours"),
+    RecordTypeEnum.GROWTH: ("height_cm", "weight_kg", "head_circumference_cm", "activities"),
+    RecordTypeEnum.MEAL: (
+        "meal_datetime", "unknown_time", "duration_minutes", "meal_type",
+        "meal_detail", "amount_ml", "amount_text", "burp",
+    ),
+    RecordTypeEnum.HEALTH: ("health_datetime", "unknown_time", "title", "symptoms", "medicines"),
+    RecordTypeEnum.DIAPER: ("diaper_datetime", "unknown_time", "diaper_type", "amount", "condition", "color"),
+    RecordTypeEnum.ETC: ("title",),
+}
+
+
 def _record_to_response(record) -> dict:
-    """Record 모델을 응답 형태로 변환"""
+    """Record 모델을 응답 형태로 변환 (record_type 의 상세 관계만 참조)"""
     data = {
         "id": record.id,
         "kid_id": record.kid_id,
@@ -469,63 +654,64 @@ def _record_to_response(record) -> dict:
     }
 
     # 타입별 상세 정보 추가
-    if record.sleep_record:
-        sr = record.sleep_record
-        data.update({
-            "sleep_type": sr.sleep_type,
-            "start_datetime": sr.start_datetime,
-            "end_datetime": sr.end_datetime,
-            "sleep_quality": sr.sleep_quality,
-            "duration_hours": sr.duration_hours,
-        })
-
-    if record.growth_record:
-        gr = record.growth_record
-        data.update({
-            "height_cm": gr.height_cm,
-            "weight_kg": gr.weight_kg,
-            "head_circumference_cm": gr.head_circumference_cm,
-            "activities": gr.activities,
-        })
-
-    if record.meal_record:
-        mr = record.meal_record
-        data.update({
-            "meal_datetime": mr.meal_datetime,
-            "unknown_time": mr.unknown_time,
-            "duration_minutes": mr.duration_minutes,
-            "meal_type": mr.meal_type,
-            "meal_detail": mr.meal_detail,
-            "amount_ml": mr.amount_ml,
-            "amount_text": mr.amount_text,
-            "burp": mr.burp,
-        })
-
-    if record.health_record:
-        hr = record.health_record
-        data.update({
-            "health_datetime": hr.health_datetime,
-            "unknown_time": hr.unknown_time,
-            "title": hr.title,
-            "symptoms": hr.symptoms,
-            "medicines": hr.medicines,
-        })
-
-    if record.diaper_record:
-        dr = record.diaper_record
-        data.update({
-            "diaper_datetime": dr.diaper_datetime,
-            "unknown_time": dr.unknown_time,
-            "diaper_type": dr.diaper_type,
-            "amount": dr.amount,
-            "condition": dr.condition,
-            "color": dr.color,
-        })
-
-    if record.etc_record:
-        er = record.etc_record
-        data.update({
-            "title": er.title,
-        })
+    detail = record.detail
+    if detail is not None:
+        data.update({field: getattr(detail, field) for field in DETAIL_RESPONSE_FIELDS[record.record_type]})
 
     return data
+
+
+def _export_value(value):
+    """내보내기용 값 변환 (enum -> 값, 날짜 -> ISO 문자열)"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, list):
+        return [_export_value(v) for v in value]
+    return value
+
+
+def _export_stream(
+    kid_id: int,
+    export_format: str,
+    record_type: Optional[RecordTypeEnum],
+    start_date: Optional[date],
+    end_date: Optional[date]
+) -> Iterator[str]:
+    """청크 단위로 직렬화해 내보내는 제너레이터 (메모리에는 한 청크만 유지)"""
+    # 요청 세션(get_db)은 응답 스트리밍 전에 닫히므로 전용 세션 사용
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = None
+        if export_format == "csv":
+            types = [record_type] if record_type else list(DETAIL_RESPONSE_FIELDS)
+            detail_fields = dict.fromkeys(f for t in types for f in DETAIL_RESPONSE_FIELDS[t])
+            writer = csv.DictWriter(
+                buffer,
+                fieldnames=[*EXPORT_BASE_FIELDS, *detail_fields],
+                extrasaction="ignore"
+            )
+            buffer.write("\ufeff")  # 엑셀에서 한글이 깨지지 않도록 BOM
+            writer.writeheader()
+
+        for chunk in record_crud.iter_record_chunks(
+            db, kid_id, record_type, start_date, end_date, chunk_size=EXPORT_CHUNK_SIZE
+        ):
+            for record in chunk:
+                data = {k: _export_value(v) for k, v in _record_to_response(record).items()}
+                if writer is not None:
+                    writer.writerow({k: "|".join(v) if isinstance(v, list) else v for k, v in data.items()})
+                else:
+                    buffer.write(json.dumps(data, ensure_ascii=False) + "\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
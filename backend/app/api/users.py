@@ -1,10 +1,11 @@
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.database import get_db, get_async_db
+from app.core.security import get_current_user, get_current_user_detached
 from app.crud import user as user_crud
 from app.crud import kid as kid_crud
 from app.crud import record as record_crud
@@ -131,15 +132,15 @@ def get_home_data(
 
 @router.get("/me/insight", response_model=Optional[InsightResponse])
 async def get_user_insight(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_detached),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     사용자 인사이트 조회
     - 최근 7일 기록 기반 AI 생성 인사이트
     - 12시간 캐싱 (하루 2회 갱신)
     """
-    kids = kid_crud.get_kids_by_user(db, current_user.id)
+    kids = await kid_crud.get_kids_by_user_async(db, current_user.id)
 
     if not kids:
         return None
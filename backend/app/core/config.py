@@ -53,6 +53,20 @@ class Settings(BaseSettings):
             return self.database_url.replace("postgresql+psycopg2://", "postgresql+asyncpg://")
         return self.database_url.replace("postgresql://", "postgresql+asyncpg://")
 
+    # 커넥션 풀. 워커 1개당 최대 (db_pool_size + db_max_overflow) + (db_async_pool_size + db_async_max_overflow)
+    # = 기본값 15 + 20 = 35개이므로, 워커 수 × 35 ≤ Postgres max_connections - superuser_reserved_connections 가 되게 조정
+    # 동기 엔진: 일반 CRUD 라우트 (SQLAlchemy 기본값 유지, AI 경로는 비동기 엔진 사용)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # 비동기 엔진: AI 채팅/인사이트 경로
+    db_async_pool_size: int = 10
+    db_async_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # 필터 없는 아이별 기록 총 개수 캐시 (기록 생성/삭제 시 무효화, 0 이면 미사용)
+    record_total_cache_ttl_seconds: int = 300
+
     # -------------------------------------------------------------------------
     # JWT Authentication
     # -------------------------------------------------------------------------
@@ -66,6 +80,14 @@ class Settings(BaseSettings):
     # -------------------------------------------------------------------------
     openai_api_key: Optional[str] = None
     openai_model: str = "gpt-4o-mini"
+    openai_embedding_model: str = "text-embedding-ada-002"
+    # 공유 HTTP 커넥션 풀 / 호출 타임아웃
+    llm_pool_max_connections: int = 100
+    llm_pool_max_keepalive: int = 20
+    llm_pool_keepalive_expiry: float = 30.0
+    llm_timeout_seconds: float = 60.0
+    llm_connect_timeout_seconds: float = 5.0
+    llm_max_retries: int = 2
 
     # -------------------------------------------------------------------------
     # Vector DB
@@ -76,6 +98,47 @@ class Settings(BaseSettings):
         "doctor": ["doctor_docs", "common_docs"],
         "nutrition": ["nutrient_docs", "common_docs"],
     }
+    # 오프라인 빌드된 모드별 병합 인덱스 (python -m app.llm.index_builder)
+    vector_index_dir: Path = BASE_DIR / "backend" / "app" / "llm" / "vector_index"
+    # rag_search 쿼리 임베딩 캐시 (메모리 LRU + redis_url 또는 파일 2차 캐시)
+    embedding_cache_size: int = 2048
+    embedding_cache_path: Optional[Path] = None
+    embedding_cache_ttl_seconds: int = 60 * 60 * 24 * 30
+    # 로컬 라우터 (키워드 → 라벨 임베딩 중심 → LLM 순)
+    local_router_enabled: bool = True
+    router_keyword_min_hits: int = 2
+    # ada-002 는 무관한 한국어 문장끼리도 0.78 이상이 흔하므로 높게 잡고, 미달 시 LLM 라우터로 넘김
+    router_centroid_min_similarity: float = 0.86
+    router_centroid_margin: float = 0.03
+    # 라우팅과 병렬로 rag_search 선실행 후 프롬프트에 주입
+    rag_prefetch_enabled: bool = True
+    # 비개인화 답변 시맨틱 캐시 (닥터 모드, 아이 미선택, 대화 첫 질문만 대상)
+    response_cache_enabled: bool = True
+    response_cache_threshold: float = 0.95
+    response_cache_ttl_seconds: int = 60 * 60 * 6
+    response_cache_max_entries: int = 512
+    # 아이별 일지 다이제스트 캐시 (기록 CRUD 시 증분 갱신, 날짜 변경 시 만료)
+    diary_digest_days: int = 7
+    diary_digest_capacity: int = 80
+    # 메모리 저장소 항목 수명 (다중 워커에서 다른 워커의 기록 변경이 반영되기까지 최대 지연)
+    diary_digest_memory_ttl_seconds: int = 60
+    # Redis 저장소 항목 수명 (쓰기 시 삭제되므로 재적재 경합 대비 상한)
+    diary_digest_redis_ttl_seconds: int = 600
+    # 대화 히스토리 윈도우 (최근 N턴 + 모드별 토큰 상한, 초과분은 세션 요약으로 누적)
+    history_max_turns: int = 6
+    history_token_budget: dict = {
+        "mom": 1500,
+        "doctor": 2000,
+        "nutrition": 1200,
+    }
+    history_summary_max_tokens: int = 300
+    # 새 채팅 세션 제목 백그라운드 생성 (여러 세션을 모아 LLM 1회 호출)
+    title_batch_size: int = 8
+    title_batch_window_seconds: float = 2.0
+    # 기동 시 벡터 스토어/LLM 클라이언트 예열 여부 (/health 준비 상태와 연동)
+    warmup_on_startup: bool = True
+    # /metrics 접근 토큰 (X-Metrics-Token 헤더). 미설정 시 엔드포인트 비활성화(404)
+    metrics_token: Optional[str] = None
 
     # -------------------------------------------------------------------------
     # Optional: Redis
@@ -1,17 +1,119 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
 
-engine = create_engine(settings.db_url, future=True)
+
+class PoolStats:
+    """커넥션 체크아웃 대기 시간/타임아웃 누적 지표"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, elapsed: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += elapsed
+            self.wait_max = max(self.wait_max, elapsed)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_total / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+            "wait_ms_max": round(self.wait_max * 1000, 2),
+        }
+
+
+def _instrumented(base: Type[QueuePool]) -> Type[QueuePool]:
+    """체크아웃 대기 시간을 측정하는 풀 클래스 (dispose 후 재생성돼도 지표 유지)"""
+    stats = PoolStats()
+
+    class InstrumentedPool(base):
+        pool_stats = stats
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError:
+                self.pool_stats.record_timeout()
+                raise
+            self.pool_stats.record_wait(time.perf_counter() - started)
+            return conn
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def _pool_options(pool_size: int, max_overflow: int) -> Dict[str, Any]:
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+engine = create_engine(
+    settings.db_url,
+    future=True,
+    poolclass=_instrumented(QueuePool),
+    **_pool_options(settings.db_pool_size, settings.db_max_overflow),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
 
+# AI 엔드포인트용 비동기 엔진 (asyncpg). LLM 호출 중에도 이벤트 루프를 막지 않음
+async_engine = create_async_engine(
+    settings.db_url_async,
+    poolclass=_instrumented(AsyncAdaptedQueuePool),
+    **_pool_options(settings.db_async_pool_size, settings.db_async_max_overflow),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,  # 커밋 후 응답 직렬화 시 lazy refresh(동기 IO) 방지
+)
+
 Base = declarative_base()
 
 
+def pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """동기/비동기 엔진 커넥션 풀 현황 (/metrics)"""
+    return {
+        "sync": engine.pool.pool_stats.snapshot(engine.pool),
+        "async": async_engine.sync_engine.pool.pool_stats.snapshot(async_engine.sync_engine.pool),
+    }
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
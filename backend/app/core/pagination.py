@@ -0,0 +1,43 @@
+"""
+키셋(커서) 페이지네이션 공통 유틸
+- 마지막 행의 정렬 키 값을 base64url(JSON) 토큰으로 인코딩해 next_cursor 로 반환
+- 다음 요청은 OFFSET 대신 (정렬 키) < (커서 값) 조건으로 이어서 조회
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Sequence
+
+
+class InvalidCursor(ValueError):
+    """디코딩/검증에 실패한 커서"""
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """정렬 키 값들을 불투명 토큰으로 변환"""
+    raw = json.dumps([_serialize(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, *parsers: Callable[[Any], Any]) -> List[Any]:
+    """토큰을 정렬 키 값들로 복원 (parsers: 키 순서별 변환 함수)"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise InvalidCursor(token)
+        return [parse(v) for parse, v in zip(parsers, values)]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError) as exc:
+        raise InvalidCursor(token) from exc
+
+
+def split_page(rows: Sequence[Any], limit: int):
+    """limit + 1 건 조회 결과를 (현재 페이지, 다음 페이지 존재 여부) 로 분리"""
+    return list(rows[:limit]), len(rows) > limit
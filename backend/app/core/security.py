@@ -7,7 +7,7 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, AsyncSessionLocal
 from app.models.user import User
 from app.crud.user import get_user
 
@@ -73,6 +73,33 @@ def get_current_user(
     return user
 
 
+async def get_current_user_detached(token: str = Depends(oauth2_scheme)) -> User:
+    """
+    현재 인증된 사용자 조회 (AI 엔드포인트용)
+    짧은 세션으로 조회 후 바로 커넥션을 반납하고, 분리(detached)된 User 를 반환
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="인증 정보가 유효하지 않습니다",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    payload = decode_token(token)
+    if payload is None:
+        raise credentials_exception
+
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise credentials_exception
+
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, int(user_id))
+    if user is None:
+        raise credentials_exception
+
+    return user
+
+
 def get_current_user_optional(
     token: Optional[str] = Depends(OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)),
     db: Session = Depends(get_db)
@@ -24,15 +24,22 @@ from app.crud.kid import (
     update_kid,
     delete_kid,
     count_kids_by_user,
+    get_kid_by_user_async,
+    get_latest_kid_by_user_async,
+    get_kids_by_user_async,
 )
 
 from app.crud.record import (
     get_record,
     get_record_with_details,
+    load_record_details,
     get_records_by_kid,
+    record_page_key,
     get_records_by_date,
+    iter_record_chunks,
     count_records_by_kid,
     delete_record,
+    bulk_create_records,
     create_sleep_record,
     update_sleep_record,
     create_growth_record,
@@ -45,12 +52,14 @@ from app.crud.record import (
     update_diaper_record,
     create_etc_record,
     update_etc_record,
+    get_record_stats,
 )
 
 from app.crud.community import (
     get_post,
     get_post_with_author,
     get_posts,
+    post_page_key,
     create_post,
     update_post,
     delete_post,
@@ -92,13 +101,20 @@ __all__ = [
     "update_kid",
     "delete_kid",
     "count_kids_by_user",
+    "get_kid_by_user_async",
+    "get_latest_kid_by_user_async",
+    "get_kids_by_user_async",
     # Record
     "get_record",
     "get_record_with_details",
+    "load_record_details",
     "get_records_by_kid",
+    "record_page_key",
     "get_records_by_date",
+    "iter_record_chunks",
     "count_records_by_kid",
     "delete_record",
+    "bulk_create_records",
     "create_sleep_record",
     "update_sleep_record",
     "create_growth_record",
@@ -111,10 +127,12 @@ __all__ = [
     "update_diaper_record",
     "create_etc_record",
     "update_etc_record",
+    "get_record_stats",
     # Community
     "get_post",
     "get_post_with_author",
     "get_posts",
+    "post_page_key",
     "create_post",
     "update_post",
     "delete_post",
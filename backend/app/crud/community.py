@@ -1,6 +1,7 @@
-from typing import Optional, List, Tuple
+from datetime import datetime
+from typing import Any, Optional, List, Tuple
 
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, tuple_
 from sqlalchemy.orm import Session, joinedload
 
 from app.models.community import Post, Comment, PostLike, CommentLike
@@ -8,6 +9,14 @@ from app.models.enums import CommunityCategoryEnum
 from app.schemas.community import PostCreate, PostUpdate, CommentCreate, CommentUpdate
 
 
+# 커서 페이지네이션을 지원하는 정렬 기준 -> 커서 값 변환 함수
+POST_CURSOR_SORTS = {
+    "created_at": datetime.fromisoformat,
+    "likes_count": int,
+    "comment_count": int,
+}
+
+
 # =============================================================================
 # Post CRUD
 # =============================================================================
@@ -34,9 +43,13 @@ def get_posts(
     skip: int = 0,
     limit: int = 20,
     sort_by: str = "created_at",
-    sort_order: str = "desc"
+    sort_order: str = "desc",
+    after: Optional[Tuple[Any, int]] = None
 ) -> Tuple[List[Post], int]:
-    """게시글 목록 조회"""
+    """
+    게시글 목록 조회
+    - after: 이전 페이지 마지막 게시글의 post_page_key (키셋 페이지네이션, 지정 시 skip 무시)
+    """
     # 기본 쿼리
     stmt = select(Post).options(joinedload(Post.user), joinedload(Post.kid))
 
@@ -53,12 +66,12 @@ def get_posts(
             )
         )
 
-    # 정렬
+    # 정렬 (동률은 id 로 고정해 페이지 경계가 흔들리지 않게 함)
     sort_column = getattr(Post, sort_by, Post.created_at)
     if sort_order == "desc":
-        stmt = stmt.order_by(sort_column.desc())
+        stmt = stmt.order_by(sort_column.desc(), Post.id.desc())
     else:
-        stmt = stmt.order_by(sort_column.asc())
+        stmt = stmt.order_by(sort_column.asc(), Post.id.asc())
 
     # 전체 개수
     count_stmt = select(func.count(Post.id))
@@ -76,12 +89,22 @@ def get_posts(
     total = db.execute(count_stmt).scalar() or 0
 
     # 페이징
-    stmt = stmt.offset(skip).limit(limit)
+    if after is not None:
+        key = tuple_(sort_column, Post.id)
+        stmt = stmt.where(key < tuple(after) if sort_order == "desc" else key > tuple(after))
+    else:
+        stmt = stmt.offset(skip)
+    stmt = stmt.limit(limit)
     posts = list(db.execute(stmt).unique().scalars().all())
 
     return posts, total
 
 
+def post_page_key(post: Post, sort_by: str) -> Tuple[Any, int]:
+    """목록 정렬 키 (정렬 컬럼 값, id) - 커서 생성용"""
+    return getattr(post, sort_by), post.id
+
+
 def create_post(
     db: Session,
     user_id: int,
@@ -2,6 +2,7 @@ from datetime import date
 from typing import Optional, List
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.kid import Kid
@@ -60,3 +61,24 @@ def count_kids_by_user(db: Session, user_id: int) -> int:
     """사용자의 아이 수"""
     stmt = select(Kid).where(Kid.user_id == user_id)
     return len(list(db.execute(stmt).scalars().all()))
+
+
+# =============================================================================
+# Async (AI 엔드포인트)
+# =============================================================================
+async def get_kid_by_user_async(db: AsyncSession, kid_id: int, user_id: int) -> Optional[Kid]:
+    """사용자의 아이 조회 (비동기)"""
+    stmt = select(Kid).where(Kid.id == kid_id, Kid.user_id == user_id)
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def get_latest_kid_by_user_async(db: AsyncSession, user_id: int) -> Optional[Kid]:
+    """사용자가 가장 최근 등록한 아이 조회 (비동기)"""
+    stmt = select(Kid).where(Kid.user_id == user_id).order_by(Kid.created_at.desc()).limit(1)
+    return (await db.execute(stmt)).scalars().first()
+
+
+async def get_kids_by_user_async(db: AsyncSession, user_id: int) -> List[Kid]:
+    """사용자의 아이 목록 조회 (비동기)"""
+    stmt = select(Kid).where(Kid.user_id == user_id).order_by(Kid.birth_date.desc())
+    return list((await db.execute(stmt)).scalars().all())
@@ -1,14 +1,54 @@
+import time
+from collections import defaultdict
 from datetime import date, datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 
-from sqlalchemy import select, and_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Date, and_, cast, distinct, func, insert, literal, select, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.config import settings
 from app.models.record import (
     Record, SleepRecord, GrowthRecord, MealRecord,
-    HealthRecord, DiaperRecord, EtcRecord
+    HealthRecord, DiaperRecord, EtcRecord, DETAIL_RELATIONS
 )
-from app.models.enums import RecordTypeEnum
+from app.models.enums import RecordTypeEnum, SleepTypeEnum, DiaperTypeEnum, StoolConditionEnum
+from app.llm.diary_cache import diary_digest_cache
+
+# 필터 없는 총 개수 캐시: kid_id -> (개수, 만료 시각). 프로세스 단위, 생성/삭제 시 무효화
+_record_totals: Dict[int, Tuple[int, float]] = {}
+
+
+# record_type -> 상세(서브타입) 모델
+DETAIL_MODELS = {
+    RecordTypeEnum.SLEEP: SleepRecord,
+    RecordTypeEnum.GROWTH: GrowthRecord,
+    RecordTypeEnum.MEAL: MealRecord,
+    RecordTypeEnum.HEALTH: HealthRecord,
+    RecordTypeEnum.DIAPER: DiaperRecord,
+    RecordTypeEnum.ETC: EtcRecord,
+}
+
+
+def load_record_details(db: Session, records: List[Record]) -> List[Record]:
+    """
+    기록들의 상세 행을 record_type 별 IN 쿼리 1회씩으로 채움
+    - 6개 상세 테이블을 모두 LEFT JOIN 하지 않고, 목록에 실제 있는 타입만 조회
+    - 관계 속성은 조회 결과(없으면 None)로 확정해 이후 접근 시 lazy load 가 발생하지 않음
+    """
+    by_type: Dict[RecordTypeEnum, List[Record]] = defaultdict(list)
+    for record in records:
+        by_type[record.record_type].append(record)
+
+    for record_type, group in by_type.items():
+        model = DETAIL_MODELS[record_type]
+        stmt = select(model).where(model.record_id.in_([r.id for r in group]))
+        details = {d.record_id: d for d in db.execute(stmt).scalars()}
+        for record in group:
+            for other_type, attr in DETAIL_RELATIONS.items():
+                value = details.get(record.id) if other_type == record_type else None
+                set_committed_value(record, attr, value)
+    return records
 
 
 # =============================================================================
@@ -20,20 +60,11 @@ def get_record(db: Session, record_id: int) -> Optional[Record]:
 
 
 def get_record_with_details(db: Session, record_id: int) -> Optional[Record]:
-    """기록 조회 (상세 정보 포함)"""
-    stmt = (
-        select(Record)
-        .options(
-            joinedload(Record.sleep_record),
-            joinedload(Record.growth_record),
-            joinedload(Record.meal_record),
-            joinedload(Record.health_record),
-            joinedload(Record.diaper_record),
-            joinedload(Record.etc_record),
-        )
-        .where(Record.id == record_id)
-    )
-    return db.execute(stmt).scalar_one_or_none()
+    """기록 조회 (자기 타입의 상세 정보 포함)"""
+    record = db.execute(select(Record).where(Record.id == record_id)).scalar_one_or_none()
+    if record is not None:
+        load_record_details(db, [record])
+    return record
 
 
 def get_records_by_kid(
@@ -43,88 +74,161 @@ def get_records_by_kid(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     skip: int = 0,
-    limit: int = 50
+    limit: int = 50,
+    after: Optional[Tuple[date, datetime, int]] = None
 ) -> List[Record]:
-    """아이의 기록 목록 조회"""
-    stmt = (
-        select(Record)
-        .options(
-            joinedload(Record.sleep_record),
-            joinedload(Record.growth_record),
-            joinedload(Record.meal_record),
-            joinedload(Record.health_record),
-            joinedload(Record.diaper_record),
-            joinedload(Record.etc_record),
-        )
-        .where(Record.kid_id == kid_id)
-    )
-
-    if record_type:
-        stmt = stmt.where(Record.record_type == record_type)
-    if start_date:
-        stmt = stmt.where(Record.record_date >= start_date)
-    if end_date:
-        stmt = stmt.where(Record.record_date <= end_date)
-
-    stmt = stmt.order_by(Record.record_date.desc(), Record.created_at.desc())
-    stmt = stmt.offset(skip).limit(limit)
+    """
+    아이의 기록 목록 조회
+    - after: 이전 페이지 마지막 기록의 record_page_key (키셋 페이지네이션, 지정 시 skip 무시)
+    """
+    stmt = _filter_records(select(Record), kid_id, record_type, start_date, end_date)
+    if after is not None:
+        stmt = stmt.where(tuple_(Record.record_date, Record.created_at, Record.id) < tuple(after))
+    else:
+        stmt = stmt.offset(skip)
+    stmt = stmt.order_by(Record.record_date.desc(), Record.created_at.desc(), Record.id.desc())
+    stmt = stmt.limit(limit)
 
-    return list(db.execute(stmt).unique().scalars().all())
+    return load_record_details(db, list(db.execute(stmt).scalars().all()))
 
 
 def get_records_by_date(db: Session, kid_id: int, record_date: date) -> List[Record]:
     """특정 날짜의 기록 조회"""
     stmt = (
         select(Record)
-        .options(
-            joinedload(Record.sleep_record),
-            joinedload(Record.growth_record),
-            joinedload(Record.meal_record),
-            joinedload(Record.health_record),
-            joinedload(Record.diaper_record),
-            joinedload(Record.etc_record),
-        )
         .where(and_(Record.kid_id == kid_id, Record.record_date == record_date))
         .order_by(Record.created_at.desc())
     )
-    return list(db.execute(stmt).unique().scalars().all())
+    return load_record_details(db, list(db.execute(stmt).scalars().all()))
 
 
-def count_records_by_kid(
+def iter_record_chunks(
     db: Session,
     kid_id: int,
-    record_type: Optional[RecordTypeEnum] = None
-) -> int:
-    """아이의 기록 수"""
-    stmt = select(Record).where(Record.kid_id == kid_id)
+    record_type: Optional[RecordTypeEnum] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    chunk_size: int = 500
+) -> Iterator[List[Record]]:
+    """
+    내보내기용 기록 스트리밍 조회 (서버측 커서로 chunk_size 건씩, 오래된 순)
+    - 청크마다 상세를 타입별 IN 쿼리로 채우고, 다음 청크 전에 세션에서 분리해 메모리 사용량 일정 유지
+    """
+    stmt = (
+        _filter_records(select(Record), kid_id, record_type, start_date, end_date)
+        .order_by(Record.record_date, Record.created_at, Record.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for chunk in db.execute(stmt).scalars().partitions():
+        yield load_record_details(db, list(chunk))
+        db.expunge_all()
+
+
+def record_page_key(record: Record) -> Tuple[date, datetime, int]:
+    """목록 정렬 키 (record_date, created_at, id) - 커서 생성용"""
+    return record.record_date, record.created_at, record.id
+
+
+def _filter_records(
+    stmt,
+    kid_id: int,
+    record_type: Optional[RecordTypeEnum] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+):
+    """목록/개수 조회 공통 필터"""
+    stmt = stmt.where(Record.kid_id == kid_id)
     if record_type:
         stmt = stmt.where(Record.record_type == record_type)
-    return len(list(db.execute(stmt).scalars().all()))
+    if start_date:
+        stmt = stmt.where(Record.record_date >= start_date)
+    if end_date:
+        stmt = stmt.where(Record.record_date <= end_date)
+    return stmt
+
+
+def count_records_by_kid(
+    db: Session,
+    kid_id: int,
+    record_type: Optional[RecordTypeEnum] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> int:
+    """아이의 기록 수 (SQL COUNT, 필터 없는 총 개수는 캐시)"""
+    unfiltered = not (record_type or start_date or end_date)
+    ttl = settings.record_total_cache_ttl_seconds
+    if unfiltered and ttl > 0:
+        cached = _record_totals.get(kid_id)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+    stmt = _filter_records(
+        select(func.count()).select_from(Record),
+        kid_id, record_type, start_date, end_date,
+    )
+    total = db.execute(stmt).scalar_one()
+
+    if unfiltered and ttl > 0:
+        _record_totals[kid_id] = (total, time.monotonic() + ttl)
+    return total
 
 
 def delete_record(db: Session, record: Record) -> None:
     """기록 삭제"""
+    kid_id, record_id = record.kid_id, record.id
     db.delete(record)
     db.commit()
+    _record_totals.pop(kid_id, None)
+    diary_digest_cache.record_deleted(kid_id, record_id)
 
 
 def get_latest_record_by_kid(db: Session, kid_id: int) -> Optional[Record]:
     """아이의 가장 최근 기록 조회"""
     stmt = (
         select(Record)
-        .options(
-            joinedload(Record.sleep_record),
-            joinedload(Record.growth_record),
-            joinedload(Record.meal_record),
-            joinedload(Record.health_record),
-            joinedload(Record.diaper_record),
-            joinedload(Record.etc_record),
-        )
         .where(Record.kid_id == kid_id)
         .order_by(Record.created_at.desc())
         .limit(1)
     )
-    return db.execute(stmt).scalar_one_or_none()
+    record = db.execute(stmt).scalar_one_or_none()
+    if record is not None:
+        load_record_details(db, [record])
+    return record
+
+
+# =============================================================================
+# Bulk Create (오프라인 동기화/외부 앱 가져오기)
+# =============================================================================
+def bulk_create_records(
+    db: Session,
+    kid_id: int,
+    items: List[Tuple[RecordTypeEnum, Dict[str, Any], Dict[str, Any]]]
+) -> List[int]:
+    """
+    여러 타입의 기록을 한 트랜잭션으로 일괄 생성
+    - items: (record_type, 기본 필드(record_date/memo/image_url), 상세 필드) 목록
+    - records 는 INSERT ... RETURNING id 로 한 번에, 상세 테이블은 타입별 다건 INSERT 1회
+    - 반환: items 순서와 같은 record id 목록
+    """
+    if not items:
+        return []
+
+    record_ids = list(db.execute(
+        insert(Record).returning(Record.id, sort_by_parameter_order=True),
+        [{"kid_id": kid_id, "record_type": record_type, **base} for record_type, base, _ in items],
+    ).scalars())
+
+    details: Dict[RecordTypeEnum, List[Dict[str, Any]]] = defaultdict(list)
+    for record_id, (record_type, _, detail) in zip(record_ids, items):
+        details[record_type].append({"record_id": record_id, **detail})
+    for record_type, rows in details.items():
+        db.execute(insert(DETAIL_MODELS[record_type]), rows)
+    db.commit()
+
+    # 건별 증분 대신 캐시 항목을 한 번에 무효화
+    _record_totals.pop(kid_id, None)
+    diary_digest_cache.invalidate(kid_id)
+    return record_ids
 
 
 # =============================================================================
@@ -162,6 +266,8 @@ def create_sleep_record(
     db.add(sleep_record)
     db.commit()
     db.refresh(record)
+    _record_totals.pop(kid_id, None)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -184,6 +290,7 @@ def update_sleep_record(
 
     db.commit()
     db.refresh(record)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -222,6 +329,8 @@ def create_growth_record(
     db.add(growth_record)
     db.commit()
     db.refresh(record)
+    _record_totals.pop(kid_id, None)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -242,6 +351,7 @@ def update_growth_record(
 
     db.commit()
     db.refresh(record)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -288,6 +398,8 @@ def create_meal_record(
     db.add(meal_record)
     db.commit()
     db.refresh(record)
+    _record_totals.pop(kid_id, None)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -309,6 +421,7 @@ def update_meal_record(
 
     db.commit()
     db.refresh(record)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -349,6 +462,8 @@ def create_health_record(
     db.add(health_record)
     db.commit()
     db.refresh(record)
+    _record_totals.pop(kid_id, None)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -369,6 +484,7 @@ def update_health_record(
 
     db.commit()
     db.refresh(record)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -411,6 +527,8 @@ def create_diaper_record(
     db.add(diaper_record)
     db.commit()
     db.refresh(record)
+    _record_totals.pop(kid_id, None)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -431,6 +549,7 @@ def update_diaper_record(
 
     db.commit()
     db.refresh(record)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -463,6 +582,8 @@ def create_etc_record(
     db.add(etc_record)
     db.commit()
     db.refresh(record)
+    _record_totals.pop(kid_id, None)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -482,6 +603,7 @@ def update_etc_record(
 
     db.commit()
     db.refresh(record)
+    diary_digest_cache.record_saved(record)
     return record
 
 
@@ -524,3 +646,123 @@ def get_monthly_record_dates(
         result[date_str] = d in recorded_dates
 
     return result
+
+
+# =============================================================================
+# Stats (차트/인사이트용 기간 집계)
+# =============================================================================
+STATS_BUCKETS = ("day", "week")
+
+
+def _ratio(value: float, days: int) -> float:
+    return round(value / days, 1) if days else 0.0
+
+
+def get_record_stats(
+    db: Session,
+    kid_id: int,
+    start_date: date,
+    end_date: date,
+    bucket: str = "day"
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    수면/식사/배변 기록을 기간 단위(day|week, 주는 월요일 시작)로 DB에서 집계
+    - 상세 테이블별 GROUP BY date_trunc 1회씩, 행을 ORM 객체로 불러오지 않음
+    - 일평균 값은 "기록이 있는 날" 기준 (RecordAnalyzer 와 동일)
+    """
+    if bucket not in STATS_BUCKETS:
+        raise ValueError(f"unsupported bucket: {bucket}")
+
+    # 단위 문자열을 SQL 에 인라인해 SELECT/GROUP BY 가 같은 식으로 인식되게 함
+    period = cast(func.date_trunc(literal(bucket, literal_execute=True), Record.record_date), Date)
+    in_window = and_(
+        Record.kid_id == kid_id,
+        Record.record_date >= start_date,
+        Record.record_date <= end_date,
+    )
+    days = func.count(distinct(Record.record_date))
+
+    sleep_hours = func.extract("epoch", SleepRecord.end_datetime - SleepRecord.start_datetime) / 3600
+    sleep_stmt = (
+        select(
+            period.label("bucket"),
+            func.count(SleepRecord.id),
+            func.coalesce(func.sum(sleep_hours), 0),
+            func.count(SleepRecord.id).filter(SleepRecord.sleep_type == SleepTypeEnum.NAP),
+            days,
+        )
+        .join(SleepRecord, SleepRecord.record_id == Record.id)
+        .where(in_window)
+        .group_by(period)
+        .order_by(period)
+    )
+    sleep = [
+        {
+            "bucket": row[0],
+            "count": row[1],
+            "total_hours": round(float(row[2]), 1),
+            "avg_daily_hours": _ratio(float(row[2]), row[4]),
+            "nap_count": row[3],
+            "night_count": row[1] - row[3],
+            "days_with_records": row[4],
+        }
+        for row in db.execute(sleep_stmt).all()
+    ]
+
+    meal_stmt = (
+        select(
+            period.label("bucket"),
+            func.count(MealRecord.id),
+            func.coalesce(func.sum(MealRecord.amount_ml), 0),
+            func.avg(MealRecord.amount_ml),
+            days,
+        )
+        .join(MealRecord, MealRecord.record_id == Record.id)
+        .where(in_window)
+        .group_by(period)
+        .order_by(period)
+    )
+    meal = [
+        {
+            "bucket": row[0],
+            "count": row[1],
+            "total_ml": int(row[2]),
+            "avg_ml_per_feed": round(float(row[3]), 1) if row[3] is not None else None,
+            "avg_daily_count": _ratio(row[1], row[4]),
+            "days_with_records": row[4],
+        }
+        for row in db.execute(meal_stmt).all()
+    ]
+
+    has_stool = DiaperRecord.diaper_type.in_([DiaperTypeEnum.STOOL, DiaperTypeEnum.BOTH])
+    has_urine = DiaperRecord.diaper_type.in_([DiaperTypeEnum.URINE, DiaperTypeEnum.BOTH])
+    diaper_stmt = (
+        select(
+            period.label("bucket"),
+            func.count(DiaperRecord.id),
+            func.count(DiaperRecord.id).filter(has_stool),
+            func.count(DiaperRecord.id).filter(has_urine),
+            func.count(DiaperRecord.id).filter(
+                and_(has_stool, DiaperRecord.condition == StoolConditionEnum.DIARRHEA)
+            ),
+            days,
+        )
+        .join(DiaperRecord, DiaperRecord.record_id == Record.id)
+        .where(in_window)
+        .group_by(period)
+        .order_by(period)
+    )
+    diaper = [
+        {
+            "bucket": row[0],
+            "count": row[1],
+            "stool_count": row[2],
+            "urine_count": row[3],
+            "diarrhea_count": row[4],
+            "avg_daily_stool": _ratio(row[2], row[5]),
+            "days_with_records": row[5],
+        }
+        for row in db.execute(diaper_stmt).all()
+    ]
+
+    return {"sleep": sleep, "meal": meal, "diaper": diaper}
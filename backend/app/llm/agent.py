@@ -1,12 +1,14 @@
+import threading
 from functools import lru_cache
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain.agents.agent import RunnableMultiActionAgent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
+from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
-from app.core.config import settings
+from app.llm.clients import get_chat_model
 
 SYSTEM_PREAMBLE = {
     "mom": """당신은 맘 AI입니다. 해요체로 말하며, 매우 세심하고 사려 깊은 톤으로 감성적 공감과 안심을 전합니다. 부모의 마음을 공감하며, 육아 일상(수면, 루틴, 놀이, 위생, 팁)을 돕습니다.
@@ -50,17 +52,22 @@ SYSTEM_PREAMBLE = {
 }
 
 
+RAG_REQUIRED_RULE = "1. 답변 전에 rag_search를 반드시 호출하세요. 이것은 선택이 아닌 필수입니다."
+RAG_PREFETCHED_RULE = (
+    "1. [사전 검색 문서] 블록이 rag_search 결과입니다. 이를 근거로 답변하고, "
+    "부족할 때만 rag_search를 다른 검색어로 추가 호출하세요."
+)
+
+
 def build_llm() -> ChatOpenAI:
-    return ChatOpenAI(
-        api_key=settings.openai_api_key,
-        model=settings.openai_model,
-        temperature=0.2,
-        max_tokens=800,
-    )
+    """에이전트/요약/제목 생성용 공유 모델 (app/llm/clients.py 레지스트리)"""
+    return get_chat_model(temperature=0.2, max_tokens=800)
 
 
-def _history_to_msgs(history: List[dict]) -> List[BaseMessage]:
+def _history_to_msgs(history: List[dict], summary: Optional[str] = None) -> List[BaseMessage]:
     msgs: List[BaseMessage] = []
+    if summary:
+        msgs.append(SystemMessage(content=f"[이전 대화 요약]\n{summary}"))
     for h in history:
         if h.get("sender") == "user":
             msgs.append(HumanMessage(content=h.get("message", "")))
@@ -69,39 +76,53 @@ def _history_to_msgs(history: List[dict]) -> List[BaseMessage]:
     return msgs
 
 
-def build_agent(
-    mode: str,
-    tools: list,
-    kid_snapshot: str,
-    latest_record: str,
-    recent_digest: str,
-    history: List[dict],
-    personalize: bool = False,
-) -> Tuple[AgentExecutor, List[BaseMessage]]:
-    system = f"""{SYSTEM_PREAMBLE.get(mode, SYSTEM_PREAMBLE["mom"])}
+# 시스템 프롬프트 골격. 모드/사전검색 여부만 고정하고, 사용자별 블록은 호출 시 변수로 주입
+SYSTEM_TEMPLATE = """{preamble}
 
 [사용 가능한 도구]
-- rag_search: 전문 문서 검색 (필수 호출)
+- rag_search: 전문 문서 검색 ({rag_label})
 - diary_recent: 최근 7일 일지 조회
-- diary_latest: 가장 최근 일지 1건{chr(10) + "- web_search: 웹 검색 (보조)" if mode == "nutrition" else ""}
+- diary_latest: 가장 최근 일지 1건{web_tool}
 
 [아이 정보 - 개인화 답변에 활용]
-{kid_snapshot}
+{{kid_snapshot}}
 
 [가장 최근 일지]
-{latest_record}
+{{latest_record}}
 
 [최근 7일 일지 요약]
-{recent_digest}
+{{recent_digest}}
 
 [개인화 필요 여부]
-{"예" if personalize else "아니오"}
+{{personalize}}{prefetched_block}
 
 [답변 형식]
 1. 아이 이름을 자연스럽게 언급하며 개인화된 답변 제공
 2. rag_search에서 찾은 정보 기반으로 답변"""
 
-    prompt = ChatPromptTemplate.from_messages(
+_agent_cache: Dict[Tuple[str, bool, Tuple[str, ...]], RunnableMultiActionAgent] = {}
+_agent_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_prompt(mode: str, prefetched: bool = False) -> ChatPromptTemplate:
+    """모드별 프롬프트 골격 (프로세스당 1회 생성)"""
+    preamble = SYSTEM_PREAMBLE.get(mode, SYSTEM_PREAMBLE["mom"])
+    rag_label = "필수 호출"
+    prefetched_block = ""
+    if prefetched:
+        # 사전 검색 결과가 있으면 필수 도구 호출 왕복을 생략하도록 안내
+        preamble = preamble.replace(RAG_REQUIRED_RULE, RAG_PREFETCHED_RULE)
+        rag_label = "필요 시 추가 검색"
+        prefetched_block = "\n\n[사전 검색 문서]\n{prefetched_rag}"
+
+    system = SYSTEM_TEMPLATE.format(
+        preamble=preamble,
+        rag_label=rag_label,
+        web_tool="\n- web_search: 웹 검색 (보조)" if mode == "nutrition" else "",
+        prefetched_block=prefetched_block,
+    )
+    return ChatPromptTemplate.from_messages(
         [
             ("system", system),
             MessagesPlaceholder("chat_history"),
@@ -109,12 +130,57 @@ def build_agent(
             MessagesPlaceholder("agent_scratchpad"),
         ]
     )
-    llm = build_llm()
-    agent = create_tool_calling_agent(llm, tools, prompt)
-    return AgentExecutor(
+
+
+def get_compiled_agent(mode: str, tools: list, prefetched: bool = False) -> RunnableMultiActionAgent:
+    """
+    모드별 컴파일된 tool-calling 에이전트 (프롬프트 | 도구 바인딩된 LLM | 파서).
+    도구 스키마(이름/설명/인자)는 요청마다 같고 함수 클로저만 다르므로,
+    이름 목록으로 캐시하고 실제 실행 함수는 요청별 AgentExecutor 에 넘긴다.
+    """
+    key = (mode, prefetched, tuple(t.name for t in tools))
+    agent = _agent_cache.get(key)
+    if agent is None:
+        with _agent_lock:
+            agent = _agent_cache.get(key)
+            if agent is None:
+                runnable = create_tool_calling_agent(build_llm(), tools, get_prompt(mode, prefetched))
+                agent = RunnableMultiActionAgent(runnable=runnable, stream_runnable=True)
+                _agent_cache[key] = agent
+    return agent
+
+
+def build_agent(
+    mode: str,
+    tools: list,
+    kid_snapshot: str,
+    latest_record: str,
+    recent_digest: str,
+    history: List[dict],
+    personalize: bool = False,
+    prefetched_rag: Optional[str] = None,
+    history_summary: Optional[str] = None,
+) -> Tuple[AgentExecutor, Dict[str, Any]]:
+    """
+    캐시된 에이전트에 요청별 도구만 묶은 실행기와 프롬프트 변수를 반환.
+    호출 측에서 변수에 "input" 을 더해 ainvoke/astream_events 에 넘긴다.
+    """
+    prefetched = bool(prefetched_rag)
+    agent = get_compiled_agent(mode, tools, prefetched)
+    executor = AgentExecutor(
         agent=agent,
         tools=tools,
         verbose=True,  # 디버깅: 콘솔에 도구 호출 로그 출력
         handle_parsing_errors=True,
         return_intermediate_steps=True,  # 도구 호출 내역 반환
-    ), _history_to_msgs(history)
+    )
+    variables: Dict[str, Any] = {
+        "chat_history": _history_to_msgs(history, history_summary),
+        "kid_snapshot": kid_snapshot,
+        "latest_record": latest_record,
+        "recent_digest": recent_digest,
+        "personalize": "예" if personalize else "아니오",
+    }
+    if prefetched:
+        variables["prefetched_rag"] = prefetched_rag
+    return executor, variables
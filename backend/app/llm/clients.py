@@ -0,0 +1,92 @@
+"""
+LLM 클라이언트 레지스트리
+- 설정(모델/temperature/max_tokens/timeout)별 ChatOpenAI 인스턴스를 프로세스당 1개만 생성
+- 모든 모델/임베딩 클라이언트가 keep-alive httpx 커넥션 풀을 공유 (TLS 핸드셰이크 반복 방지)
+- httpx 클라이언트 timeout 은 기본값이고, 모델별 timeout 이 요청마다 적용됨
+"""
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from app.core.config import settings
+
+_lock = threading.Lock()
+_async_client: Optional[httpx.AsyncClient] = None
+_sync_client: Optional[httpx.Client] = None
+_chat_models: Dict[Tuple[str, float, Optional[int], float], ChatOpenAI] = {}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.llm_pool_max_connections,
+        max_keepalive_connections=settings.llm_pool_max_keepalive,
+        keepalive_expiry=settings.llm_pool_keepalive_expiry,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds)
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """ainvoke/astream 용 공유 비동기 HTTP 클라이언트"""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        with _lock:
+            if _async_client is None or _async_client.is_closed:
+                _async_client = httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+    return _async_client
+
+
+def get_sync_http_client() -> httpx.Client:
+    """invoke(스레드 실행 도구/임베딩) 용 공유 동기 HTTP 클라이언트"""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        with _lock:
+            if _sync_client is None or _sync_client.is_closed:
+                _sync_client = httpx.Client(limits=_limits(), timeout=_timeout())
+    return _sync_client
+
+
+def get_chat_model(
+    temperature: float = 0.2,
+    max_tokens: Optional[int] = None,
+    model: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> ChatOpenAI:
+    """설정별로 캐시된 ChatOpenAI 반환 (요청 간 공유, timeout 미지정 시 settings.llm_timeout_seconds)"""
+    key = (model or settings.openai_model, temperature, max_tokens, timeout or settings.llm_timeout_seconds)
+    llm = _chat_models.get(key)
+    if llm is None:
+        # 공유 HTTP 클라이언트도 _lock 을 쓰므로 잠그기 전에 준비 (Lock 은 재진입 불가)
+        http_client, http_async_client = get_sync_http_client(), get_async_http_client()
+        with _lock:
+            llm = _chat_models.get(key)
+            if llm is None:
+                llm = ChatOpenAI(
+                    api_key=settings.openai_api_key,
+                    model=key[0],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=key[3],
+                    max_retries=settings.llm_max_retries,
+                    http_client=http_client,
+                    http_async_client=http_async_client,
+                )
+                _chat_models[key] = llm
+    return llm
+
+
+async def close_clients() -> None:
+    """워커 종료 시 커넥션 풀 정리"""
+    global _async_client, _sync_client
+    with _lock:
+        async_client, sync_client = _async_client, _sync_client
+        _async_client = _sync_client = None
+        _chat_models.clear()
+    if async_client is not None:
+        await async_client.aclose()
+    if sync_client is not None:
+        sync_client.close()
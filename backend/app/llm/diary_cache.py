@@ -0,0 +1,317 @@
+"""
+아이별 일지 다이제스트 캐시
+- 최근 N일 기록(최신순, 최대 capacity 건)의 설명 문자열과 가장 최근 기록 1건을 아이별로 보관
+- crud/record.py 의 생성/수정/삭제 시 해당 항목만 증분 반영 (전체 재조회 없음)
+- 날짜(UTC)가 바뀌면 만료되어 다음 조회 때 다시 적재
+- 저장소: settings.redis_url 이 있으면 Redis (워커 간 공유), 없으면 프로세스 메모리
+  - 메모리: 다른 워커의 기록 변경은 전달되지 않으므로 짧은 TTL 로 오래된 항목 노출을 제한
+  - Redis: 여러 워커가 동시에 고치면 갱신이 유실될 수 있어, 쓰기 시 삭제하고 다음 조회 때 재적재
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models import Record, RecordTypeEnum
+
+# [record_id, created_at ISO, 설명 문자열]
+DigestItem = list
+
+
+def describe_record(record: Record) -> str:
+    """기록을 프롬프트용 한 줄 문자열로 변환"""
+    detail = record.memo or ""
+    # record_type 의 상세 관계만 참조 (다른 타입 관계는 조회하지 않음)
+    row = record.detail
+    record_type = record.record_type
+
+    # 타입별 상세 정보 추가
+    if row is None:
+        pass
+    elif record_type == RecordTypeEnum.SLEEP:
+        sr = row
+        parts = [f"{sr.sleep_type.value}"]
+        parts.append(f"{sr.duration_hours}시간")
+        parts.append(f"{sr.start_datetime:%H:%M}~{sr.end_datetime:%H:%M}")
+        if sr.sleep_quality:
+            parts.append(f"수면질 {sr.sleep_quality.value}")
+        detail = "수면 " + ", ".join(parts)
+    elif record_type == RecordTypeEnum.MEAL:
+        mr = row
+        parts = [f"{mr.meal_type.value}"]
+        if mr.meal_detail:
+            parts.append(mr.meal_detail)
+        if mr.amount_ml:
+            parts.append(f"{mr.amount_ml}ml")
+        if mr.amount_text:
+            parts.append(mr.amount_text)
+        if mr.duration_minutes:
+            parts.append(f"{mr.duration_minutes}분")
+        if mr.burp:
+            parts.append("트림함")
+        detail = "식사 " + ", ".join(parts)
+    elif record_type == RecordTypeEnum.DIAPER:
+        dr = row
+        parts = [dr.diaper_type.value]
+        if dr.amount:
+            parts.append(dr.amount.value)
+        if dr.condition:
+            parts.append(dr.condition.value)
+        if dr.color:
+            parts.append(dr.color.value)
+        detail = "배변 (" + ", ".join(parts) + ")"
+    elif record_type == RecordTypeEnum.HEALTH:
+        hr = row
+        parts = [hr.title]
+        if hr.symptoms:
+            parts.append("증상 " + ", ".join([s.value for s in hr.symptoms]))
+        if hr.medicines:
+            parts.append("투약 " + ", ".join([m.value for m in hr.medicines]))
+        detail = "건강 " + ", ".join(parts)
+    elif record_type == RecordTypeEnum.GROWTH:
+        gr = row
+        parts = []
+        if gr.height_cm:
+            parts.append(f"키 {gr.height_cm}cm")
+        if gr.weight_kg:
+            parts.append(f"몸무게 {gr.weight_kg}kg")
+        if gr.head_circumference_cm:
+            parts.append(f"머리둘레 {gr.head_circumference_cm}cm")
+        detail = "성장 " + ", ".join(parts) if parts else "성장 기록"
+    elif record_type == RecordTypeEnum.ETC:
+        detail = f"기타: {row.title}"
+
+    return f"{record.created_at:%Y-%m-%d %H:%M} [{record.record_type.value}] {detail}"
+
+
+def _as_utc(value: datetime) -> datetime:
+    """naive 는 UTC 로 간주하고, aware 는 UTC 로 변환 (naive/aware 혼합 비교 방지)"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _created_at(item: DigestItem) -> datetime:
+    return _as_utc(datetime.fromisoformat(item[1]))
+
+
+def _since(days: int) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def _item(record: Record) -> DigestItem:
+    return [record.id, _as_utc(record.created_at).isoformat(), describe_record(record)]
+
+
+def _today() -> str:
+    return datetime.utcnow().date().isoformat()
+
+
+def _seconds_until_midnight() -> int:
+    now = datetime.utcnow()
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(int((tomorrow - now).total_seconds()), 1)
+
+
+class _MemoryStore:
+    shared = False
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._data: Dict[int, Tuple[float, dict]] = {}
+        self._next_sweep = time.monotonic() + ttl_seconds
+        # 요청 스레드/다이제스트 갱신이 동시에 접근 (정리 중 dict 순회 보호)
+        self._lock = threading.Lock()
+
+    def get(self, kid_id: int) -> Optional[dict]:
+        with self._lock:
+            item = self._data.get(kid_id)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at <= time.monotonic():
+                self._data.pop(kid_id, None)
+                return None
+            return entry
+
+    def set(self, kid_id: int, entry: dict) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            # 증분 갱신도 만료 시각을 늘리지 않음 (다른 워커의 변경은 TTL 이 지나야 반영)
+            item = self._data.get(kid_id)
+            expires_at = item[0] if item and item[0] > now else now + self.ttl_seconds
+            self._data[kid_id] = (expires_at, entry)
+
+    def delete(self, kid_id: int) -> None:
+        with self._lock:
+            self._data.pop(kid_id, None)
+
+    def _sweep(self, now: float) -> None:
+        """다시 조회되지 않는 아이의 만료 항목 정리 (TTL 주기마다 최대 1회, 보관 수는 TTL 내 활성 아이 수로 제한)"""
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.ttl_seconds
+        for kid_id in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+            del self._data[kid_id]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _RedisStore:
+    shared = True
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis  # 선택 의존성
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(kid_id: int) -> str:
+        return f"diary_digest:{kid_id}"
+
+    def get(self, kid_id: int) -> Optional[dict]:
+        raw = self.client.get(self._key(kid_id))
+        return json.loads(raw) if raw else None
+
+    def set(self, kid_id: int, entry: dict) -> None:
+        # 날짜 경계 또는 TTL 중 먼저 오는 시점에 만료 (조회-재적재와 쓰기 삭제가 엇갈린 경우의 안전장치)
+        ex = min(_seconds_until_midnight(), self.ttl_seconds)
+        self.client.set(self._key(kid_id), json.dumps(entry, ensure_ascii=False), ex=ex)
+
+    def delete(self, kid_id: int) -> None:
+        self.client.delete(self._key(kid_id))
+
+
+class DiaryDigestCache:
+    def __init__(self, days: int, capacity: int, store):
+        self.days = days
+        self.capacity = capacity
+        self.store = store
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "updates": 0, "invalidations": 0, "errors": 0}
+
+    # ------------------------------------------------------------------ 조회
+    def _load(self, kid_id: int) -> Optional[dict]:
+        try:
+            entry = self.store.get(kid_id)
+        except Exception as exc:
+            self._stats["errors"] += 1
+            print(f"[DiaryCache] get failed kid={kid_id}: {exc}")
+            return None
+        return entry if entry and entry.get("day") == _today() else None
+
+    def get(self, kid_id: int) -> Optional[dict]:
+        entry = self._load(kid_id)
+        self._stats["hits" if entry else "misses"] += 1
+        return entry
+
+    def build(self, kid_id: int, latest: Optional[Record], recent: List[Record]) -> dict:
+        """조회한 기록으로 항목 적재 (recent 는 최신순, 최근 days 일, 최대 capacity 건)"""
+        entry = {
+            "day": _today(),
+            "latest": _item(latest) if latest else None,
+            "records": [_item(r) for r in recent[: self.capacity]],
+        }
+        self._save(kid_id, entry)
+        return entry
+
+    @staticmethod
+    def latest_line(entry: dict) -> Optional[str]:
+        return entry["latest"][2] if entry.get("latest") else None
+
+    @staticmethod
+    def recent_lines(entry: dict, days: int, limit: int) -> List[str]:
+        since = _since(days)
+        return [item[2] for item in entry["records"] if _created_at(item) >= since][:limit]
+
+    # ------------------------------------------------------------------ 증분 반영 (crud/record.py)
+    def record_saved(self, record: Record) -> None:
+        """생성/수정된 기록 1건만 다시 설명해 항목에 반영 (공유 저장소는 삭제 후 재적재)"""
+        kid_id = record.kid_id
+        if self.store.shared:
+            self.invalidate(kid_id)
+            return
+        try:
+            with self._lock:
+                entry = self._load(kid_id)
+                if entry is None:
+                    return
+                item = _item(record)
+                records = [r for r in entry["records"] if r[0] != record.id]
+                created_at = _created_at(item)
+                if created_at >= _since(self.days):
+                    records.append(item)
+                    records.sort(key=_created_at, reverse=True)
+                    records = records[: self.capacity]
+                entry["records"] = records
+                latest = entry.get("latest")
+                if latest is None or latest[0] == record.id or created_at >= _created_at(latest):
+                    entry["latest"] = item
+                self._save(kid_id, entry)
+                self._stats["updates"] += 1
+        except Exception as exc:
+            self._stats["errors"] += 1
+            print(f"[DiaryCache] update failed kid={kid_id}: {exc}")
+            self.invalidate(kid_id)
+
+    def record_deleted(self, kid_id: int, record_id: int) -> None:
+        """삭제된 기록 제거. 대체 항목을 알 수 없으면(최신 기록/가득 찬 목록) 무효화"""
+        if self.store.shared:
+            self.invalidate(kid_id)
+            return
+        try:
+            with self._lock:
+                entry = self._load(kid_id)
+                if entry is None:
+                    return
+                latest = entry.get("latest")
+                full = len(entry["records"]) >= self.capacity
+                in_records = any(r[0] == record_id for r in entry["records"])
+                if (latest and latest[0] == record_id) or (in_records and full):
+                    self.invalidate(kid_id)
+                    return
+                entry["records"] = [r for r in entry["records"] if r[0] != record_id]
+                self._save(kid_id, entry)
+                self._stats["updates"] += 1
+        except Exception as exc:
+            self._stats["errors"] += 1
+            print(f"[DiaryCache] delete failed kid={kid_id}: {exc}")
+            self.invalidate(kid_id)
+
+    def invalidate(self, kid_id: int) -> None:
+        try:
+            self.store.delete(kid_id)
+            self._stats["invalidations"] += 1
+        except Exception as exc:
+            self._stats["errors"] += 1
+            print(f"[DiaryCache] invalidate failed kid={kid_id}: {exc}")
+
+    def _save(self, kid_id: int, entry: dict) -> None:
+        try:
+            self.store.set(kid_id, entry)
+        except Exception as exc:
+            self._stats["errors"] += 1
+            print(f"[DiaryCache] save failed kid={kid_id}: {exc}")
+
+    def stats(self) -> Dict[str, float]:
+        total = self._stats["hits"] + self._stats["misses"]
+        return {**self._stats, "hit_rate": round(self._stats["hits"] / total, 4) if total else 0.0}
+
+
+def _build_store():
+    if settings.redis_url:
+        try:
+            return _RedisStore(settings.redis_url, settings.diary_digest_redis_ttl_seconds)
+        except Exception as exc:
+            print(f"[DiaryCache] redis unavailable, using memory: {exc}")
+    return _MemoryStore(settings.diary_digest_memory_ttl_seconds)
+
+
+diary_digest_cache = DiaryDigestCache(
+    days=settings.diary_digest_days,
+    capacity=settings.diary_digest_capacity,
+    store=_build_store(),
+)
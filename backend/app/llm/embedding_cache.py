@@ -0,0 +1,160 @@
+"""
+rag_search 쿼리 임베딩 캐시
+- 1차: 프로세스 내 LRU
+- 2차(선택): Redis (settings.redis_url) 또는 로컬 sqlite 파일 (settings.embedding_cache_path)
+- 키: 임베딩 모델 + 정규화된 쿼리 텍스트 (임베딩 자체는 원문 그대로 계산해 캐시 미사용 시와 같은 벡터)
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """공백/대소문자 차이만 있는 질문을 같은 키로 취급"""
+    return _WHITESPACE.sub(" ", (text or "").strip()).lower()
+
+
+# 2차 캐시에 남은 이전 항목(정규화 텍스트로 계산한 벡터)을 쓰지 않도록 키 버전 구분
+CACHE_KEY_VERSION = "v2"
+
+
+def cache_key(model: str, text: str) -> str:
+    digest = hashlib.sha1(f"{model}\n{normalize_query(text)}".encode("utf-8")).hexdigest()
+    return f"emb:{CACHE_KEY_VERSION}:{model}:{digest}"
+
+
+class _RedisTier:
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis  # 선택 의존성
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> Optional[List[float]]:
+        raw = self.client.get(key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key: str, vector: List[float]) -> None:
+        self.client.set(key, json.dumps(vector), ex=self.ttl_seconds)
+
+
+class _SqliteTier:
+    def __init__(self, path: Path, ttl_seconds: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector TEXT, created REAL)"
+        )
+        self.conn.commit()
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT vector, created FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if not row or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created) VALUES (?, ?, ?)",
+                (key, json.dumps(vector), time.time()),
+            )
+            self.conn.commit()
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    embed_query 결과를 캐시하는 Embeddings 래퍼.
+    embed_documents(인덱스 빌드용)는 그대로 위임한다.
+    """
+
+    def __init__(self, inner: Embeddings, model: str, max_size: int = 2048, remote=None):
+        self.inner = inner
+        self.model = model
+        self.max_size = max_size
+        self.remote = remote
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "remote_hits": 0, "misses": 0, "remote_errors": 0}
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = cache_key(self.model, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return vector
+
+        if self.remote is not None:
+            try:
+                vector = self.remote.get(key)
+            except Exception:
+                vector = None
+                self._stats["remote_errors"] += 1
+            if vector is not None:
+                self._stats["remote_hits"] += 1
+                self._remember(key, vector)
+                return vector
+
+        self._stats["misses"] += 1
+        vector = self.inner.embed_query(text)
+        self._remember(key, vector)
+        if self.remote is not None:
+            try:
+                self.remote.set(key, vector)
+            except Exception:
+                self._stats["remote_errors"] += 1
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+    def stats(self) -> Dict[str, float]:
+        hits = self._stats["memory_hits"] + self._stats["remote_hits"]
+        total = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._memory),
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+
+
+def build_remote_tier():
+    """설정에 따라 Redis 또는 sqlite 2차 캐시 생성 (둘 다 없으면 None)"""
+    ttl = settings.embedding_cache_ttl_seconds
+    if settings.redis_url:
+        try:
+            return _RedisTier(settings.redis_url, ttl)
+        except Exception as exc:
+            print(f"[EmbeddingCache] redis tier disabled: {exc}")
+    if settings.embedding_cache_path:
+        try:
+            return _SqliteTier(Path(settings.embedding_cache_path), ttl)
+        except Exception as exc:
+            print(f"[EmbeddingCache] disk tier disabled: {exc}")
+    return None
@@ -0,0 +1,132 @@
+"""
+서버측 대화 히스토리 윈도우
+- session_id 로 ChatMessage 를 직접 조회 (클라이언트가 보낸 history 는 세션이 없을 때만 사용)
+- 최근 N턴을 모드별 토큰 예산(tiktoken) 안에서만 프롬프트에 포함
+- 윈도우 밖의 오래된 턴은 ChatSession.history_summary 에 누적 요약 (백그라운드 갱신)
+"""
+import asyncio
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Set
+
+import tiktoken
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.llm.clients import get_chat_model
+from app.models import ChatMessage, ChatSession
+
+# 메시지 1건당 역할/구분자 토큰 (OpenAI chat 포맷 근사치)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_summarizing: Set[int] = set()
+# 이벤트 루프는 태스크를 약한 참조로만 들고 있으므로 완료 전까지 강한 참조를 유지 (GC 로 중단 방지)
+_tasks: Set[asyncio.Task] = set()
+
+
+@dataclass
+class HistoryWindow:
+    messages: List[dict] = field(default_factory=list)  # {"sender", "message"} (오래된 순)
+    summary: Optional[str] = None
+    tokens: int = 0
+
+
+@lru_cache(maxsize=1)
+def _encoding() -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(settings.openai_model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: Optional[str]) -> int:
+    return len(_encoding().encode(text or "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def token_budget(mode: str) -> int:
+    return settings.history_token_budget.get(mode, settings.history_token_budget["mom"])
+
+
+def apply_window(messages: List[dict], mode: str, summary: Optional[str] = None) -> HistoryWindow:
+    """최신 메시지부터 최대 턴 수/토큰 예산 안에서 거꾸로 채움"""
+    budget = token_budget(mode)
+    used = count_tokens(summary) if summary else 0
+    kept: List[dict] = []
+    for msg in reversed(messages[-settings.history_max_turns * 2:]):
+        cost = count_tokens(msg.get("message"))
+        if used + cost > budget:
+            break
+        kept.append(msg)
+        used += cost
+    kept.reverse()
+    return HistoryWindow(messages=kept, summary=summary, tokens=used)
+
+
+async def load_history_window(
+    session_id: Optional[int],
+    user_id: int,
+    mode: str,
+    fallback: Optional[List[dict]] = None,
+) -> HistoryWindow:
+    """
+    세션 히스토리를 짧은 트랜잭션으로 조회해 윈도우 적용.
+    요약에 아직 반영되지 않은 채 윈도우 밖으로 밀려난 턴이 있으면 요약 갱신을 예약한다.
+    """
+    if not session_id:
+        return apply_window(list(fallback or []), mode)
+
+    async with AsyncSessionLocal() as db:
+        session = await db.get(ChatSession, session_id)
+        if session is None or session.user_id != user_id:
+            return apply_window(list(fallback or []), mode)
+        summary = session.history_summary
+        stmt = select(ChatMessage.id, ChatMessage.sender, ChatMessage.content).where(
+            ChatMessage.session_id == session_id
+        )
+        if session.summary_until_id:
+            stmt = stmt.where(ChatMessage.id > session.summary_until_id)
+        rows = (await db.execute(stmt.order_by(ChatMessage.id))).all()
+
+    messages = [{"id": r.id, "sender": r.sender, "message": r.content} for r in rows]
+    window = apply_window(messages, mode, summary)
+    overflow = messages[: len(messages) - len(window.messages)]
+    if overflow and session_id not in _summarizing:
+        _summarizing.add(session_id)
+        task = asyncio.create_task(_refresh_summary(session_id, summary, overflow))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+    return window
+
+
+async def _refresh_summary(session_id: int, summary: Optional[str], overflow: List[dict]) -> None:
+    """기존 요약 + 윈도우 밖 턴을 합쳐 새 요약 저장 (summary_until_id 로 중복 반영 방지)"""
+    try:
+        lines = "\n".join(
+            f"{'사용자' if m['sender'] == 'user' else 'AI'}: {m['message']}" for m in overflow
+        )
+        prompt = (
+            "아래는 육아 상담 대화의 이전 요약과 그 뒤에 이어진 대화입니다.\n"
+            "아이 상태, 부모의 고민, AI가 한 핵심 조언이 남도록 한국어로 5문장 이내로 다시 요약하세요.\n\n"
+            f"[이전 요약]\n{summary or '없음'}\n\n[이어진 대화]\n{lines}"
+        )
+        llm = get_chat_model(temperature=0.0, max_tokens=settings.history_summary_max_tokens)
+        res = await llm.ainvoke(prompt)
+        text = (res.content if hasattr(res, "content") else str(res)).strip()
+        if not text:
+            return
+        last_id = overflow[-1]["id"]
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(ChatSession)
+                .where(
+                    ChatSession.id == session_id,
+                    (ChatSession.summary_until_id.is_(None)) | (ChatSession.summary_until_id < last_id),
+                )
+                .values(history_summary=text, summary_until_id=last_id, updated_at=ChatSession.updated_at)
+            )
+            await db.commit()
+    except Exception as exc:
+        print(f"[AI History] summary refresh failed session={session_id}: {exc}")
+    finally:
+        _summarizing.discard(session_id)
@@ -0,0 +1,108 @@
+"""
+모드별 병합 FAISS 인덱스 오프라인 빌드
+- 모드(mom/doctor/nutrition)마다 전용 문서 + common_docs 를 하나로 병합
+- FAISS 네이티브 포맷(<mode>.faiss) + JSONL 문서 저장소(<mode>.docstore.jsonl) 와 줄 오프셋(<mode>.docstore.offsets.npy) 으로 저장
+- 런타임은 이 파일들을 읽기 전용 mmap 으로 열어 워커 간 메모리 페이지를 공유
+
+실행: python -m app.llm.index_builder [mode ...]
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from app.core.config import settings
+from app.llm.vector_loader import (
+    INDEX_SUFFIX,
+    DOCSTORE_SUFFIX,
+    DOCSTORE_OFFSETS_SUFFIX,
+    MANIFEST_SUFFIX,
+    _folders_signature,
+    _merge_folders,
+)
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _encode_docstore(documents: List[dict]) -> Tuple[bytes, bytes]:
+    """문서 목록을 (JSONL 바이트, 각 줄 시작 오프셋 .npy 바이트) 로 변환 (런타임은 위치로 한 줄만 읽음)"""
+    lines = [
+        json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        for doc in documents
+    ]
+    offsets = np.zeros(len(lines) + 1, dtype="<u8")
+    np.cumsum([len(line) for line in lines], out=offsets[1:])
+    buf = io.BytesIO()
+    np.save(buf, offsets)
+    return b"".join(lines), buf.getvalue()
+
+
+def build_mode_index(mode: str, out_dir: Optional[Path] = None) -> Optional[dict]:
+    """한 모드의 병합 인덱스를 빌드해 저장하고 manifest 를 반환."""
+    out_dir = out_dir or settings.vector_index_dir
+    folders = settings.mode_vector_dirs.get(mode)
+    if not folders:
+        raise ValueError(f"unknown mode: {mode}")
+
+    store = _merge_folders(settings.vector_base_dir, folders)
+    if store is None:
+        print(f"[IndexBuilder] no stores found for mode={mode}")
+        return None
+
+    documents = []
+    for position in range(store.index.ntotal):
+        doc_id = store.index_to_docstore_id[position]
+        doc = store.docstore.search(doc_id)
+        documents.append({
+            "id": doc_id,
+            "page_content": doc.page_content,
+            "metadata": doc.metadata,
+        })
+
+    signature = _folders_signature(settings.vector_base_dir, folders)
+    version = hashlib.sha1(repr(signature).encode("utf-8")).hexdigest()[:12]
+    manifest = {
+        "mode": mode,
+        "folders": folders,
+        "version": version,
+        "count": len(documents),
+        "dimension": store.index.d,
+        "embedding_model": settings.openai_embedding_model,
+        "built_at": datetime.utcnow().isoformat(),
+    }
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # 인덱스/문서 저장소를 먼저 쓰고 manifest 를 마지막에 교체
+    _atomic_write_bytes(
+        out_dir / f"{mode}{INDEX_SUFFIX}",
+        faiss.serialize_index(store.index).tobytes(),
+    )
+    docs_bytes, offsets_bytes = _encode_docstore(documents)
+    _atomic_write_bytes(out_dir / f"{mode}{DOCSTORE_SUFFIX}", docs_bytes)
+    _atomic_write_bytes(out_dir / f"{mode}{DOCSTORE_OFFSETS_SUFFIX}", offsets_bytes)
+    _atomic_write_bytes(
+        out_dir / f"{mode}{MANIFEST_SUFFIX}",
+        json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+    )
+    print(f"[IndexBuilder] mode={mode} docs={len(documents)} version={version}")
+    return manifest
+
+
+def main(modes: List[str]) -> None:
+    for mode in modes or list(settings.mode_vector_dirs):
+        build_mode_index(mode)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
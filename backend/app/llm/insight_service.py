@@ -5,13 +5,16 @@
 - LLM 기반 인사이트 문장 생성
 """
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, Any
 import random
 
-from sqlalchemy.orm import Session, joinedload
-from langchain_openai import ChatOpenAI
+import numpy as np
 
-from app.core.config import settings
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.llm.clients import get_chat_model
 from app.models import (
     Record, Kid, UserInsight,
     SleepRecord, MealRecord, DiaperRecord, HealthRecord, GrowthRecord, EtcRecord,
@@ -70,58 +73,146 @@ def get_friendly_name(full_name: str) -> str:
 
 
 class RecordAnalyzer:
-    """최근 기록 분석 및 특이사항 감지"""
+    """
+    최근 기록 분석 및 특이사항 감지
+    - 아이의 기간 내 기록을 상세 테이블 LEFT JOIN 1회 조회로 필요한 컬럼만 가져와 열(NumPy 배열) 단위로 보관
+    - 카테고리별 통계는 배열 마스크/집계로 계산하고, analyze_all 결과는 인스턴스(요청) 단위로 메모
+    """
 
-    def __init__(self, db: Session, kid_id: int, days: int = 7):
+    def __init__(self, db: Optional[Session], kid_id: int, days: int = 7):
         self.db = db
         self.kid_id = kid_id
         self.days = days
         self.since = datetime.utcnow() - timedelta(days=days)
+        self._cols: Optional[Dict[str, np.ndarray]] = None
+        self._analysis: Optional[Dict[str, Dict[str, Any]]] = None
 
-    def get_records_by_type(self, record_type: RecordTypeEnum) -> List[Record]:
-        """타입별 기록 조회"""
+    def window_query(self):
+        """분석에 필요한 컬럼만 투영한 단일 조회 (최신순)"""
         return (
-            self.db.query(Record)
-            .options(
-                joinedload(Record.sleep_record),
-                joinedload(Record.meal_record),
-                joinedload(Record.diaper_record),
-                joinedload(Record.health_record),
-                joinedload(Record.growth_record),
-                joinedload(Record.etc_record),
-            )
-            .filter(
-                Record.kid_id == self.kid_id,
-                Record.record_type == record_type,
-                Record.created_at >= self.since,
+            select(
+                Record.record_type,
+                Record.record_date,
+                SleepRecord.id.label("sleep_id"),
+                SleepRecord.sleep_type,
+                SleepRecord.start_datetime,
+                SleepRecord.end_datetime,
+                MealRecord.id.label("meal_id"),
+                MealRecord.meal_type,
+                MealRecord.amount_ml,
+                DiaperRecord.id.label("diaper_id"),
+                DiaperRecord.diaper_type,
+                DiaperRecord.condition,
+                HealthRecord.id.label("health_id"),
+                HealthRecord.symptoms,
+                HealthRecord.medicines,
+                GrowthRecord.id.label("growth_id"),
+                GrowthRecord.height_cm,
+                GrowthRecord.weight_kg,
+                GrowthRecord.activities,
+                EtcRecord.id.label("etc_id"),
+                EtcRecord.title.label("etc_title"),
             )
+            .outerjoin(SleepRecord, SleepRecord.record_id == Record.id)
+            .outerjoin(MealRecord, MealRecord.record_id == Record.id)
+            .outerjoin(DiaperRecord, DiaperRecord.record_id == Record.id)
+            .outerjoin(HealthRecord, HealthRecord.record_id == Record.id)
+            .outerjoin(GrowthRecord, GrowthRecord.record_id == Record.id)
+            .outerjoin(EtcRecord, EtcRecord.record_id == Record.id)
+            .where(Record.kid_id == self.kid_id, Record.created_at >= self.since)
             .order_by(Record.created_at.desc())
-            .all()
         )
 
+    @classmethod
+    async def load_async(cls, db: AsyncSession, kid_id: int, days: int = 7) -> "RecordAnalyzer":
+        """AsyncSession 으로 기간 데이터를 한 번 조회해 둔 분석기 생성"""
+        analyzer = cls(None, kid_id, days)
+        rows = (await db.execute(analyzer.window_query())).all()
+        analyzer._cols = analyzer._columnar(rows)
+        return analyzer
+
+    @staticmethod
+    def _columnar(rows) -> Dict[str, np.ndarray]:
+        def enum_values(values) -> np.ndarray:
+            return np.array([v.value if v is not None else "" for v in values], dtype=object)
+
+        def present(values) -> np.ndarray:
+            return np.array([v is not None for v in values], dtype=bool)
+
+        def numbers(values) -> np.ndarray:
+            return np.array([float(v) if v is not None else np.nan for v in values], dtype=float)
+
+        def enum_lists(values) -> np.ndarray:
+            # 행마다 길이가 다른 리스트라 1차원 object 배열로 보관
+            arr = np.empty(len(values), dtype=object)
+            for i, v in enumerate(values):
+                arr[i] = [e.value for e in v or []]
+            return arr
+
+        cols = list(zip(*rows)) if rows else [[] for _ in range(21)]
+        (
+            record_type, record_date,
+            sleep_id, sleep_type, start, end,
+            meal_id, meal_type, amount_ml,
+            diaper_id, diaper_type, condition,
+            health_id, symptoms, medicines,
+            growth_id, height_cm, weight_kg, activities,
+            etc_id, etc_title,
+        ) = cols
+        # timestamptz 는 tz-aware datetime 이라 datetime64 로 바로 변환할 수 없으므로 차이를 파이썬에서 계산
+        sleep_seconds = numbers([(e - s).total_seconds() if s and e else None for s, e in zip(start, end)])
+        return {
+            "type": enum_values(record_type),
+            "date": np.array(record_date, dtype="datetime64[D]"),
+            "has_sleep": present(sleep_id),
+            "sleep_type": enum_values(sleep_type),
+            # SleepRecord.duration_hours 와 동일하게 건별 소수 둘째 자리 반올림
+            "sleep_hours": np.round(sleep_seconds / 3600, 2),
+            "has_meal": present(meal_id),
+            "meal_type": enum_values(meal_type),
+            "amount_ml": numbers(amount_ml),
+            "has_diaper": present(diaper_id),
+            "diaper_type": enum_values(diaper_type),
+            "condition": enum_values(condition),
+            "has_health": present(health_id),
+            "symptoms": enum_lists(symptoms),
+            "medicines": enum_lists(medicines),
+            "has_growth": present(growth_id),
+            "height_cm": numbers(height_cm),
+            "weight_kg": numbers(weight_kg),
+            "activities": enum_lists(activities),
+            "has_etc": present(etc_id),
+            "etc_title": np.array(etc_title, dtype=object),
+        }
+
+    @property
+    def cols(self) -> Dict[str, np.ndarray]:
+        if self._cols is None:
+            self._cols = self._columnar(self.db.execute(self.window_query()).all())
+        return self._cols
+
+    def _type_mask(self, record_type: RecordTypeEnum) -> np.ndarray:
+        return self.cols["type"] == record_type.value
+
+    @staticmethod
+    def _days_with_records(dates: np.ndarray) -> int:
+        return len(np.unique(dates)) or 1
+
     def analyze_sleep(self) -> Dict[str, Any]:
         """수면 기록 분석"""
-        records = self.get_records_by_type(RecordTypeEnum.SLEEP)
-        if not records:
+        c = self.cols
+        mask = self._type_mask(RecordTypeEnum.SLEEP)
+        count = int(mask.sum())
+        if not count:
             return {"count": 0, "anomaly": None, "data": None}
 
-        total_hours = 0
-        nap_count = 0
-        night_count = 0
-        record_dates = set()  # 기록이 있는 날짜들
-
-        for r in records:
-            sr = r.sleep_record
-            if sr:
-                total_hours += sr.duration_hours
-                record_dates.add(r.record_date)
-                if sr.sleep_type.value == "nap":
-                    nap_count += 1
-                else:
-                    night_count += 1
+        rows = mask & c["has_sleep"]
+        total_hours = float(c["sleep_hours"][rows].sum())
+        nap_count = int((c["sleep_type"][rows] == "nap").sum())
+        night_count = int(rows.sum()) - nap_count
 
         # 기록이 있는 날 수로 평균 계산
-        days_with_records = len(record_dates) if record_dates else 1
+        days_with_records = self._days_with_records(c["date"][rows])
         avg_daily = total_hours / days_with_records
         anomaly = None
 
@@ -134,7 +225,7 @@ class RecordAnalyzer:
             anomaly = "high_sleep"
 
         return {
-            "count": len(records),
+            "count": count,
             "anomaly": anomaly,
             "data": {
                 "total_hours": round(total_hours, 1),
@@ -147,27 +238,20 @@ class RecordAnalyzer:
 
     def analyze_meal(self) -> Dict[str, Any]:
         """식사 기록 분석"""
-        records = self.get_records_by_type(RecordTypeEnum.MEAL)
-        if not records:
+        c = self.cols
+        mask = self._type_mask(RecordTypeEnum.MEAL)
+        count = int(mask.sum())
+        if not count:
             return {"count": 0, "anomaly": None, "data": None}
 
-        total_ml = 0
-        meal_count = 0
-        type_counts = {}
-        record_dates = set()  # 기록이 있는 날짜들
-
-        for r in records:
-            mr = r.meal_record
-            if mr:
-                meal_count += 1
-                record_dates.add(r.record_date)
-                if mr.amount_ml:
-                    total_ml += mr.amount_ml
-                meal_type = mr.meal_type.value
-                type_counts[meal_type] = type_counts.get(meal_type, 0) + 1
+        rows = mask & c["has_meal"]
+        meal_count = int(rows.sum())
+        total_ml = int(np.nansum(c["amount_ml"][rows]))
+        types, type_totals = np.unique(c["meal_type"][rows].astype(str), return_counts=True)
+        type_counts = {str(t): int(n) for t, n in zip(types, type_totals)}
 
         # 기록이 있는 날 수로 평균 계산
-        days_with_records = len(record_dates) if record_dates else 1
+        days_with_records = self._days_with_records(c["date"][rows])
         avg_daily_count = meal_count / days_with_records
         anomaly = None
 
@@ -178,7 +262,7 @@ class RecordAnalyzer:
             anomaly = "low_amount"
 
         return {
-            "count": len(records),
+            "count": count,
             "anomaly": anomaly,
             "data": {
                 "total_ml": total_ml,
@@ -191,28 +275,18 @@ class RecordAnalyzer:
 
     def analyze_diaper(self) -> Dict[str, Any]:
         """배변 기록 분석"""
-        records = self.get_records_by_type(RecordTypeEnum.DIAPER)
-        if not records:
+        c = self.cols
+        mask = self._type_mask(RecordTypeEnum.DIAPER)
+        count = int(mask.sum())
+        if not count:
             return {"count": 0, "anomaly": None, "data": None}
 
-        stool_count = 0
-        urine_count = 0
-        diarrhea_count = 0
-        constipation_days = 0
-        last_stool_date = None
-
-        for r in records:
-            dr = r.diaper_record
-            if dr:
-                dtype = dr.diaper_type.value
-                if dtype in ("stool", "both"):
-                    stool_count += 1
-                    if last_stool_date is None or r.record_date > last_stool_date:
-                        last_stool_date = r.record_date
-                    if dr.condition == StoolConditionEnum.DIARRHEA:
-                        diarrhea_count += 1
-                if dtype in ("urine", "both"):
-                    urine_count += 1
+        rows = mask & c["has_diaper"]
+        dtype = c["diaper_type"]
+        stool = rows & ((dtype == "stool") | (dtype == "both"))
+        stool_count = int(stool.sum())
+        urine_count = int((rows & ((dtype == "urine") | (dtype == "both"))).sum())
+        diarrhea_count = int((stool & (c["condition"] == StoolConditionEnum.DIARRHEA.value)).sum())
 
         anomaly = None
 
@@ -225,7 +299,7 @@ class RecordAnalyzer:
             anomaly = "low_stool"
 
         return {
-            "count": len(records),
+            "count": count,
             "anomaly": anomaly,
             "data": {
                 "stool_count": stool_count,
@@ -236,32 +310,26 @@ class RecordAnalyzer:
 
     def analyze_health(self) -> Dict[str, Any]:
         """건강 기록 분석"""
-        records = self.get_records_by_type(RecordTypeEnum.HEALTH)
-        if not records:
+        c = self.cols
+        mask = self._type_mask(RecordTypeEnum.HEALTH)
+        count = int(mask.sum())
+        if not count:
             return {"count": 0, "anomaly": None, "data": None}
 
-        all_symptoms = []
-        all_medicines = []
-
-        for r in records:
-            hr = r.health_record
-            if hr:
-                if hr.symptoms:
-                    all_symptoms.extend([s.value for s in hr.symptoms])
-                if hr.medicines:
-                    all_medicines.extend([m.value for m in hr.medicines])
+        rows = mask & c["has_health"]
+        all_symptoms = [s for values in c["symptoms"][rows] for s in values]
+        all_medicines = [m for values in c["medicines"][rows] for m in values]
 
         anomaly = None
 
         # 특이사항 감지: 건강 기록이 있으면 특이사항으로 간주
-        if len(records) > 0:
-            if "fever" in all_symptoms:
-                anomaly = "fever_detected"
-            elif len(all_symptoms) > 0:
-                anomaly = "symptoms_detected"
+        if "fever" in all_symptoms:
+            anomaly = "fever_detected"
+        elif len(all_symptoms) > 0:
+            anomaly = "symptoms_detected"
 
         return {
-            "count": len(records),
+            "count": count,
             "anomaly": anomaly,
             "data": {
                 "symptoms": list(set(all_symptoms)),
@@ -271,52 +339,59 @@ class RecordAnalyzer:
 
     def analyze_growth(self) -> Dict[str, Any]:
         """성장 기록 분석"""
-        records = self.get_records_by_type(RecordTypeEnum.GROWTH)
-        if not records:
+        c = self.cols
+        mask = self._type_mask(RecordTypeEnum.GROWTH)
+        count = int(mask.sum())
+        if not count:
             return {"count": 0, "anomaly": None, "data": None}
 
-        latest = records[0].growth_record if records else None
+        # 최신순 정렬이므로 첫 성장 기록이 가장 최근 값
+        latest = int(np.flatnonzero(mask)[0])
         anomaly = None
 
         data = {}
-        if latest:
-            if latest.height_cm:
-                data["height_cm"] = float(latest.height_cm)
-            if latest.weight_kg:
-                data["weight_kg"] = float(latest.weight_kg)
-            if latest.activities:
-                data["activities"] = [a.value for a in latest.activities]
+        if c["has_growth"][latest]:
+            if c["height_cm"][latest] > 0:
+                data["height_cm"] = float(c["height_cm"][latest])
+            if c["weight_kg"][latest] > 0:
+                data["weight_kg"] = float(c["weight_kg"][latest])
+            if c["activities"][latest]:
+                data["activities"] = list(c["activities"][latest])
 
         return {
-            "count": len(records),
+            "count": count,
             "anomaly": anomaly,
             "data": data if data else None,
         }
 
     def analyze_etc(self) -> Dict[str, Any]:
         """기타 기록 분석"""
-        records = self.get_records_by_type(RecordTypeEnum.ETC)
-        if not records:
+        c = self.cols
+        mask = self._type_mask(RecordTypeEnum.ETC)
+        count = int(mask.sum())
+        if not count:
             return {"count": 0, "anomaly": None, "data": None}
 
-        titles = [r.etc_record.title for r in records if r.etc_record]
+        titles = list(c["etc_title"][mask & c["has_etc"]])
 
         return {
-            "count": len(records),
+            "count": count,
             "anomaly": None,
             "data": {"titles": titles[:5]},  # 최근 5개만
         }
 
     def analyze_all(self) -> Dict[str, Dict[str, Any]]:
-        """모든 카테고리 분석"""
-        return {
-            "sleep": self.analyze_sleep(),
-            "meal": self.analyze_meal(),
-            "diaper": self.analyze_diaper(),
-            "health": self.analyze_health(),
-            "growth": self.analyze_growth(),
-            "etc": self.analyze_etc(),
-        }
+        """모든 카테고리 분석 (인스턴스 단위 메모)"""
+        if self._analysis is None:
+            self._analysis = {
+                "sleep": self.analyze_sleep(),
+                "meal": self.analyze_meal(),
+                "diaper": self.analyze_diaper(),
+                "health": self.analyze_health(),
+                "growth": self.analyze_growth(),
+                "etc": self.analyze_etc(),
+            }
+        return self._analysis
 
     def select_category(self) -> Optional[str]:
         """
@@ -352,11 +427,7 @@ class InsightGenerator:
     """LLM 기반 인사이트 생성"""
 
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.openai_model,
-            api_key=settings.openai_api_key,
-            temperature=0.7,
-        )
+        self.llm = get_chat_model(temperature=0.7)
 
     async def generate(
         self,
@@ -400,7 +471,7 @@ class InsightGenerator:
 
 
 async def get_or_create_insight(
-    db: Session,
+    db: AsyncSession,
     user_id: int,
     kid: Kid,
 ) -> Optional[UserInsight]:
@@ -411,30 +482,30 @@ async def get_or_create_insight(
     """
     # 1. 캐시 확인 (12시간 이내)
     cache_threshold = datetime.utcnow() - timedelta(hours=12)
-    cached = (
-        db.query(UserInsight)
-        .filter(
+    stmt = (
+        select(UserInsight)
+        .where(
             UserInsight.user_id == user_id,
             UserInsight.kid_id == kid.id,
             UserInsight.generated_at >= cache_threshold,
         )
         .order_by(UserInsight.generated_at.desc())
-        .first()
+        .limit(1)
     )
+    cached = (await db.execute(stmt)).scalars().first()
 
     if cached:
         return cached
 
-    # 2. 새로 생성
-    analyzer = RecordAnalyzer(db, kid.id)
+    # 2. 새로 생성 (기간 기록 1회 조회 후 메모된 분석 결과로 카테고리 선택)
+    analyzer = await RecordAnalyzer.load_async(db, kid.id)
     category = analyzer.select_category()
 
     if not category:
         # 기록이 없는 경우
         return None
 
-    analysis = analyzer.analyze_all()
-    category_data = analysis[category]
+    category_data = analyzer.analyze_all()[category]
 
     generator = InsightGenerator()
     insight_text = await generator.generate(
@@ -451,7 +522,7 @@ async def get_or_create_insight(
         insight_text=insight_text,
     )
     db.add(new_insight)
-    db.commit()
-    db.refresh(new_insight)
+    await db.commit()
+    await db.refresh(new_insight)
 
     return new_insight
@@ -0,0 +1,144 @@
+"""
+라우팅/프롬프트용 키워드 매처
+- 모든 카테고리 키워드를 import 시 한 번 Aho-Corasick 오토마톤으로 컴파일
+- 메시지를 한 번만 훑어 겹치는 키워드까지 모두 찾음 (기존 `k in message` 와 동일한 의미)
+- 결과(KeywordMatch)는 라우팅, 프롬프트 구성, 로그에서 재사용
+"""
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+KEYWORD_CATEGORIES: Dict[str, List[str]] = {
+    # 개인화(월령 맞춤) 필요 주제
+    "personalization": [
+        "수유", "모유", "분유", "이유식", "식단", "영양", "간식",
+        "수면", "잠", "낮잠", "밤잠", "루틴",
+        "성장", "키", "몸무게", "체중", "머리둘레", "발달",
+        "배변", "기저귀", "설사", "변비",
+    ],
+    # 맘/영양 모드에서 닥터 AI 전환이 필요한 주제
+    "doctor_handoff": [
+        "증상", "진단", "치료", "병", "질환", "의학", "의료",
+        "백내장", "감기", "열", "고열", "구토", "설사", "발진",
+        "경련", "호흡곤란", "통증", "통증이", "상처", "염증",
+        "눈", "시력", "안과",
+    ],
+    "medical": [
+        "증상", "진단", "치료", "병", "질환", "의학", "의료",
+        "백내장", "감기", "열", "고열", "구토", "설사", "발진",
+        "경련", "호흡곤란", "통증", "상처", "염증",
+        "눈", "시력", "안과", "검사", "처방", "약",
+    ],
+    "emotional": [
+        "우울", "불안", "스트레스", "불면", "무기력", "번아웃",
+        "힘들", "지쳐", "외롭", "위로", "공감", "감정", "마음",
+        "산후", "산후우울", "산후우울증", "육아우울",
+    ],
+    "kid_info": [
+        "몇살", "나이", "개월", "생년월일", "성별", "이름", "아기 이름",
+        "우리애", "우리 아이", "아이 정보", "키", "몸무게",
+        "머리둘레", "두위", "성장", "큰편", "작은편", "평균", "비교",
+    ],
+    "growth_compare": [
+        "머리둘레", "두위", "성장", "큰편", "작은편", "평균", "비교",
+        "정상", "표준", "백분위",
+    ],
+    # 로컬 라우터 (app/llm/router.py) 카테고리별 키워드
+    "route_mom": [
+        "수면", "낮잠", "밤잠", "재우", "잠투정", "루틴", "놀이", "장난감", "습관",
+        "훈육", "떼쓰", "울음", "목욕", "외출", "어린이집", "분리불안", "산후", "육아",
+    ],
+    "route_doctor": [
+        "증상", "진단", "치료", "질환", "의학", "의료", "병원", "응급",
+        "감기", "고열", "열이", "구토", "설사", "발진", "경련", "호흡곤란",
+        "통증", "염증", "예방접종", "백신", "안과", "시력", "처방",
+        # 한 글자 "약" 은 약간/예약/약속/요약에도 걸리므로 복용 표현으로만 매칭
+        "약을", "약 먹", "약먹", "해열제", "항생제", "투약", "복용",
+    ],
+    "route_nutrition": [
+        "식단", "영양", "수유", "모유", "분유", "이유식", "유아식", "간식",
+        "알러지", "알레르기", "레시피", "식재료", "음식", "먹어도", "먹이",
+    ],
+}
+
+
+class KeywordMatch:
+    """한 메시지에 대한 매칭 결과"""
+
+    def __init__(self, hits: Dict[str, List[str]]):
+        # 카테고리 → 매칭된 키워드 (등장 순서, 중복 포함)
+        self.hits = hits
+
+    def has(self, category: str) -> bool:
+        return bool(self.hits.get(category))
+
+    def terms(self, category: str) -> List[str]:
+        return sorted(set(self.hits.get(category, [])))
+
+    def count(self, category: str) -> int:
+        return len(self.hits.get(category, []))
+
+    @property
+    def categories(self) -> List[str]:
+        return sorted(c for c, terms in self.hits.items() if terms)
+
+
+class KeywordMatcher:
+    """Aho-Corasick 다중 패턴 매처"""
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, Tuple[str, ...]]]] = [[]]
+
+        term_categories: Dict[str, Set[str]] = {}
+        for category, terms in categories.items():
+            for term in terms:
+                term_categories.setdefault(term, set()).add(category)
+        for term, cats in term_categories.items():
+            self._add(term, tuple(sorted(cats)))
+        self._build_fail_links()
+
+    def _add(self, term: str, cats: Tuple[str, ...]) -> None:
+        node = 0
+        for ch in term:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((term, cats))
+
+    def _build_fail_links(self) -> None:
+        # 루트 자식의 실패 링크는 루트(0). 그 아래는 BFS 로 부모의 실패 링크를 따라 계산
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def match(self, message: Optional[str]) -> KeywordMatch:
+        hits: Dict[str, List[str]] = {}
+        node = 0
+        for ch in message or "":
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for term, cats in self._out[node]:
+                for category in cats:
+                    hits.setdefault(category, []).append(term)
+        return KeywordMatch(hits)
+
+
+keyword_matcher = KeywordMatcher(KEYWORD_CATEGORIES)
+
+
+def match_keywords(message: Optional[str]) -> KeywordMatch:
+    return keyword_matcher.match(message)
@@ -0,0 +1,88 @@
+"""
+비개인화 AI 답변 시맨틱 캐시
+- 대상: 닥터 모드의 첫 질문 중 아이 정보/대화 히스토리 없이 실행되는 턴만 (CACHE_MODE)
+  - 맘/영양 모드는 항상 개인화(_needs_personalization)되고, 아이가 선택되면 프롬프트에 그 가정의 기록이 들어가므로
+    다른 사용자에게 같은 답을 줄 수 없음 → 의도적으로 캐시하지 않음
+- 키: 라우팅 결정 + 인덱스 빌드 버전, 그 안에서 질문 임베딩 유사도로 조회
+- 인덱스 버전이 바뀌면(문서 변경) 이전 버전 항목은 조회되지 않고 정리됨
+- 항목은 TTL 이후 만료
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# 캐시를 사용하는 유일한 모드
+CACHE_MODE = "doctor"
+
+# (decision, target, suggest_mom_note, index_version)
+BucketKey = Tuple[str, str, bool, str]
+
+
+def _unit(vector: List[float]) -> np.ndarray:
+    arr = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(arr)
+    return arr / norm if norm else arr
+
+
+class SemanticResponseCache:
+    def __init__(self, threshold: float, ttl_seconds: int, max_entries: int):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._buckets: Dict[BucketKey, List[Tuple[np.ndarray, float, Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "invalidated": 0}
+
+    def _drop_stale_versions(self, key: BucketKey) -> None:
+        """다른 인덱스 버전 버킷 제거 (코퍼스 변경)"""
+        stale = [k for k in self._buckets if k[-1] != key[-1]]
+        for k in stale:
+            self._stats["invalidated"] += len(self._buckets.pop(k))
+
+    def lookup(self, key: BucketKey, vector: List[float]) -> Optional[Dict[str, Any]]:
+        query = _unit(vector)
+        now = time.time()
+        with self._lock:
+            self._drop_stale_versions(key)
+            entries = [e for e in self._buckets.get(key, []) if now - e[1] < self.ttl_seconds]
+            self._buckets[key] = entries
+            if entries:
+                matrix = np.stack([e[0] for e in entries])
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._stats["hits"] += 1
+                    return entries[best][2]
+            self._stats["misses"] += 1
+            return None
+
+    def store(self, key: BucketKey, vector: List[float], payload: Dict[str, Any]) -> None:
+        with self._lock:
+            entries = self._buckets.setdefault(key, [])
+            entries.append((_unit(vector), time.time(), payload))
+            if len(entries) > self.max_entries:
+                del entries[: len(entries) - self.max_entries]
+            self._stats["stores"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, float]:
+        total = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": sum(len(v) for v in self._buckets.values()),
+            "hit_rate": round(self._stats["hits"] / total, 4) if total else 0.0,
+        }
+
+
+response_cache = SemanticResponseCache(
+    threshold=settings.response_cache_threshold,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    max_entries=settings.response_cache_max_entries,
+)
@@ -0,0 +1,201 @@
+"""
+질문 라우팅 엔진
+1. 키워드 매칭 (app/llm/keywords.py 오토마톤) 으로 확실한 경우 즉시 결정
+2. 라벨 예시 문장 임베딩 중심(centroid) 과의 유사도로 결정
+3. 두 단계 모두 확신이 낮을 때만 LLM 라우터 호출
+"""
+import asyncio
+import json
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.llm.clients import get_chat_model
+from app.llm.keywords import KeywordMatch, match_keywords
+from app.llm.vector_loader import get_embeddings
+
+ROUTE_LABELS = ("mom", "doctor", "nutrition")
+# 육아와 무관한 질문 (LLM 라우터의 other). centroid 가 가장 가까우면 로컬에서 결정하지 않음
+OTHER_LABEL = "other"
+
+# 라벨별 대표 질문 (centroid 계산용, other 포함)
+ROUTE_EXAMPLES: Dict[str, List[str]] = {
+    "mom": [
+        "아기가 낮잠을 잘 안 자요 어떻게 재워야 하나요",
+        "밤에 자주 깨서 울어요 수면 루틴을 어떻게 만들까요",
+        "돌 아기랑 집에서 할 만한 놀이가 뭐가 있을까요",
+        "육아가 너무 힘들고 지쳐요",
+        "어린이집 적응 기간에 분리불안이 심해요",
+        "아기 목욕은 하루에 몇 번 시키나요",
+    ],
+    "doctor": [
+        "아기가 열이 39도까지 올라요 병원에 가야 하나요",
+        "기침이랑 콧물이 일주일째 계속돼요",
+        "몸에 빨간 발진이 생겼어요",
+        "예방접종 후에 열이 나는데 괜찮은가요",
+        "아기가 계속 토하고 설사를 해요",
+        "눈곱이 많이 끼고 눈이 충혈됐어요",
+    ],
+    "nutrition": [
+        "이유식은 언제부터 시작하나요",
+        "분유는 하루에 몇 ml 먹여야 하나요",
+        "돌 아기 간식으로 뭐가 좋을까요",
+        "계란 알레르기가 걱정돼요 언제 먹여도 되나요",
+        "유아식 식단을 어떻게 짜야 할까요",
+        "모유 수유 중에 피해야 할 음식이 있나요",
+    ],
+    OTHER_LABEL: [
+        "내일 서울 날씨 어때요",
+        "요즘 주식 뭐 사야 하나요",
+        "파이썬 코드 에러 좀 봐주세요",
+        "제주도 여행 코스 추천해 주세요",
+        "자동차 보험 갱신은 어떻게 하나요",
+        "회사 이직 고민이 있어요",
+    ],
+}
+
+
+def keyword_scores(match: KeywordMatch) -> Dict[str, int]:
+    """라우팅 라벨별 키워드 등장 횟수"""
+    return {label: match.count(f"route_{label}") for label in ROUTE_LABELS}
+
+
+async def classify_with_llm(message: str, mode: str) -> dict:
+    if not message:
+        return {"decision": "ambiguous", "target": mode, "reason": "empty message"}
+
+    system = (
+        "You are a router for a childcare assistant. "
+        "Classify the user's question for routing.\n\n"
+        "Categories:\n"
+        "- mom: 육아 일상(수면, 루틴, 놀이, 습관, 생활 팁)\n"
+        "- doctor: 의료/진단/치료/질환/증상/안과/응급\n"
+        "- nutrition: 식단/영양/수유/이유식/알러지/레시피\n"
+        "- other: 위 범주 외\n\n"
+        "Given current_mode, choose the best target category and decision:\n"
+        "- in_scope: clearly fits current_mode\n"
+        "- ambiguous: overlaps current_mode and another category\n"
+        "- off_topic: clearly not current_mode\n\n"
+        "Hard rules:\n"
+        "- If current_mode is mom or nutrition and the question is medical/diagnosis/treatment, "
+        "decision must be off_topic and target must be doctor.\n"
+        "- If current_mode is doctor and question is clearly nutrition/recipe, target nutrition.\n\n"
+        "Return ONLY JSON with keys: decision, target, reason."
+    )
+    prompt = (
+        f"{system}\n\n"
+        f"current_mode: {mode}\n"
+        f"question: {message}"
+    )
+
+    llm = get_chat_model(temperature=0.0, max_tokens=200)
+    try:
+        result = await llm.ainvoke(prompt)
+        content = result.content if hasattr(result, "content") else str(result)
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            match = re.search(r"\{.*\}", content, re.DOTALL)
+            if not match:
+                raise
+            data = json.loads(match.group(0))
+        return {
+            "decision": data.get("decision", "ambiguous"),
+            "target": data.get("target", mode),
+            "reason": data.get("reason", ""),
+        }
+    except Exception:
+        return {"decision": "ambiguous", "target": mode, "reason": "fallback"}
+
+
+class QuestionRouter:
+    """로컬 분류 우선, 확신이 낮을 때만 LLM 라우터 사용"""
+
+    def __init__(self):
+        self._centroids: Optional[Tuple[List[str], np.ndarray]] = None
+        self._lock = threading.Lock()
+        self._stats = {"keyword": 0, "centroid": 0, "llm": 0, "empty": 0}
+
+    def centroids(self) -> Tuple[List[str], np.ndarray]:
+        """라벨 예시 문장 임베딩 평균 (프로세스당 1회 계산)"""
+        if self._centroids is None:
+            with self._lock:
+                if self._centroids is None:
+                    labels = list(ROUTE_EXAMPLES)
+                    rows = []
+                    embeddings = get_embeddings()
+                    for label in labels:
+                        vectors = np.asarray(embeddings.embed_documents(ROUTE_EXAMPLES[label]), dtype=np.float32)
+                        centroid = vectors.mean(axis=0)
+                        rows.append(centroid / np.linalg.norm(centroid))
+                    self._centroids = (labels, np.stack(rows))
+        return self._centroids
+
+    def _centroid_target(self, message: str) -> Optional[Tuple[str, float, float]]:
+        labels, matrix = self.centroids()
+        query = np.asarray(get_embeddings().embed_query(message), dtype=np.float32)
+        query = query / np.linalg.norm(query)
+        scores = matrix @ query
+        order = np.argsort(scores)[::-1]
+        best, second = float(scores[order[0]]), float(scores[order[1]])
+        return labels[int(order[0])], best, best - second
+
+    @staticmethod
+    def _decide(target: str, mode: str, scores: Dict[str, int]) -> str:
+        if target == mode:
+            return "in_scope"
+        # LLM 라우터와 같은 규칙: 맘/영양 모드의 의료 질문은 키워드가 겹쳐도 닥터 AI 로 전환
+        if target == "doctor" and mode in ("mom", "nutrition"):
+            return "off_topic"
+        # 현재 모드 키워드도 함께 등장하면 겹치는 질문으로 취급
+        return "ambiguous" if scores.get(mode, 0) > 0 else "off_topic"
+
+    async def route(self, message: str, mode: str, match: Optional[KeywordMatch] = None) -> dict:
+        if not message:
+            self._stats["empty"] += 1
+            return {"decision": "ambiguous", "target": mode, "reason": "empty message"}
+
+        if settings.local_router_enabled:
+            scores = keyword_scores(match or match_keywords(message))
+            ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+            (top, top_hits), (_, next_hits) = ranked[0], ranked[1]
+            if top_hits >= settings.router_keyword_min_hits and top_hits > next_hits:
+                self._stats["keyword"] += 1
+                return {
+                    "decision": self._decide(top, mode, scores),
+                    "target": top,
+                    "reason": f"local_keyword:{top}={top_hits}",
+                }
+
+            try:
+                target, similarity, margin = await asyncio.to_thread(self._centroid_target, message)
+            except Exception as exc:
+                print(f"[AI Router] centroid classifier unavailable: {exc}")
+                target = None
+            # other 에 가장 가깝거나 유사도/차이가 기준 미달이면 LLM 라우터가 판단
+            if (
+                target
+                and target != OTHER_LABEL
+                and similarity >= settings.router_centroid_min_similarity
+                and margin >= settings.router_centroid_margin
+            ):
+                self._stats["centroid"] += 1
+                return {
+                    "decision": self._decide(target, mode, scores),
+                    "target": target,
+                    "reason": f"local_centroid:{target}={similarity:.3f}",
+                }
+
+        self._stats["llm"] += 1
+        return await classify_with_llm(message, mode)
+
+    def stats(self) -> Dict[str, float]:
+        total = sum(self._stats.values())
+        local = self._stats["keyword"] + self._stats["centroid"]
+        return {**self._stats, "local_rate": round(local / total, 4) if total else 0.0}
+
+
+question_router = QuestionRouter()
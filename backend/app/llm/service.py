@@ -1,25 +1,37 @@
+import asyncio
 from datetime import datetime, timedelta
-import json
-import re
-from typing import List, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
 
 from app.models import Kid, Record
 from app.core.config import settings
-from langchain_openai import ChatOpenAI
-from .tools import (
-    build_rag_tool,
-    build_diary_tools,
-    build_web_tool,
-)
+from app.crud.record import get_latest_record_by_kid, load_record_details
+from .diary_cache import describe_record, diary_digest_cache
+from .tools import rag_search, build_mode_tools
 from .agent import build_agent
+from .response_cache import CACHE_MODE, response_cache
+from .keywords import KeywordMatch, match_keywords
+from .router import question_router
+from .vector_loader import get_embeddings, get_index_version
 
 
 class DiaryContextBuilder:
-    def __init__(self, kid: Optional[Kid], db: Optional[Session]):
+    def __init__(
+        self,
+        kid: Optional[Kid],
+        db: Optional[Union[Session, AsyncSession]],
+        session_factory: Optional[async_sessionmaker] = None,
+    ):
         self.kid = kid
         self.db = db
+        # 지정 시 조회마다 짧은 세션을 열고 바로 반납 (LLM 실행 중 커넥션 점유 방지)
+        self.session_factory = session_factory
+        # AsyncSession 은 동시 쿼리를 허용하지 않음 (에이전트 도구 병렬 호출 대비)
+        self._lock = asyncio.Lock()
+        # 한 턴 안에서는 같은 결과를 재사용 (프롬프트 구성 후 에이전트 도구 재호출 시 DB 미접근)
+        self._memo: Dict[tuple, str] = {}
 
     def _korean_subject(self, name: str) -> str:
         if not name:
@@ -66,166 +78,140 @@ class DiaryContextBuilder:
 
     def _describe(self, record: Record) -> str:
         """기록을 문자열로 변환"""
-        detail = record.memo or ""
-
-        # 타입별 상세 정보 추가
-        if record.sleep_record:
-            sr = record.sleep_record
-            parts = [f"{sr.sleep_type.value}"]
-            parts.append(f"{sr.duration_hours}시간")
-            parts.append(f"{sr.start_datetime:%H:%M}~{sr.end_datetime:%H:%M}")
-            if sr.sleep_quality:
-                parts.append(f"수면질 {sr.sleep_quality.value}")
-            detail = "수면 " + ", ".join(parts)
-        elif record.meal_record:
-            mr = record.meal_record
-            parts = [f"{mr.meal_type.value}"]
-            if mr.meal_detail:
-                parts.append(mr.meal_detail)
-            if mr.amount_ml:
-                parts.append(f"{mr.amount_ml}ml")
-            if mr.amount_text:
-                parts.append(mr.amount_text)
-            if mr.duration_minutes:
-                parts.append(f"{mr.duration_minutes}분")
-            if mr.burp:
-                parts.append("트림함")
-            detail = "식사 " + ", ".join(parts)
-        elif record.diaper_record:
-            dr = record.diaper_record
-            parts = [dr.diaper_type.value]
-            if dr.amount:
-                parts.append(dr.amount.value)
-            if dr.condition:
-                parts.append(dr.condition.value)
-            if dr.color:
-                parts.append(dr.color.value)
-            detail = "배변 (" + ", ".join(parts) + ")"
-        elif record.health_record:
-            hr = record.health_record
-            parts = [hr.title]
-            if hr.symptoms:
-                parts.append("증상 " + ", ".join([s.value for s in hr.symptoms]))
-            if hr.medicines:
-                parts.append("투약 " + ", ".join([m.value for m in hr.medicines]))
-            detail = "건강 " + ", ".join(parts)
-        elif record.growth_record:
-            gr = record.growth_record
-            parts = []
-            if gr.height_cm:
-                parts.append(f"키 {gr.height_cm}cm")
-            if gr.weight_kg:
-                parts.append(f"몸무게 {gr.weight_kg}kg")
-            if gr.head_circumference_cm:
-                parts.append(f"머리둘레 {gr.head_circumference_cm}cm")
-            detail = "성장 " + ", ".join(parts) if parts else "성장 기록"
-        elif record.etc_record:
-            detail = f"기타: {record.etc_record.title}"
-
-        return f"{record.created_at:%Y-%m-%d %H:%M} [{record.record_type.value}] {detail}"
+        return describe_record(record)
 
-    def latest_record(self) -> str:
-        if not (self.db and self.kid):
-            return "No latest record available (DB not ready)."
-        rec = (
-            self.db.query(Record)
-            .options(
-                joinedload(Record.growth_record),
-                joinedload(Record.health_record),
-                joinedload(Record.sleep_record),
-                joinedload(Record.meal_record),
-                joinedload(Record.diaper_record),
-            )
-            .filter(Record.kid_id == self.kid.id)
-            .order_by(Record.created_at.desc())
-            .first()
-        )
-        return self._describe(rec) if rec else "No latest record."
+    def _query_latest(self) -> Optional[Record]:
+        return get_latest_record_by_kid(self.db, self.kid.id)
 
-    def recent_digest(self, days: int = 7, limit: int = 50) -> str:
-        if not (self.db and self.kid):
-            return "Recent diary digest unavailable (DB not ready)."
+    def _query_recent(self, days: int, limit: int) -> List[Record]:
+        # _describe 가 상세 관계를 참조하므로 기록 타입별 IN 쿼리로 일괄 로드 (최대 1 + 6회)
         since = datetime.utcnow() - timedelta(days=days)
-        recs = (
+        records = (
             self.db.query(Record)
             .filter(Record.kid_id == self.kid.id, Record.created_at >= since)
             .order_by(Record.created_at.desc())
             .limit(limit)
             .all()
         )
-        if not recs:
-            return "No diary records in the last 7 days."
-        return "\n".join(self._describe(r) for r in recs)
+        return load_record_details(self.db, records)
+
+    def _digest(self) -> dict:
+        """아이별 다이제스트 캐시 항목 (없으면 조회 후 적재)"""
+        entry = diary_digest_cache.get(self.kid.id)
+        if entry is None:
+            recent = self._query_recent(diary_digest_cache.days, diary_digest_cache.capacity)
+            # 같은 정렬이므로 최근 기록이 있으면 첫 건이 가장 최근 기록 (추가 쿼리 불필요)
+            latest = recent[0] if recent else self._query_latest()
+            entry = diary_digest_cache.build(self.kid.id, latest, recent)
+        return entry
+
+    @staticmethod
+    def _cacheable(days: int, limit: int) -> bool:
+        return days <= diary_digest_cache.days and limit <= diary_digest_cache.capacity
+
+    @staticmethod
+    def _latest_text(entry: dict) -> str:
+        return diary_digest_cache.latest_line(entry) or "No latest record."
+
+    @staticmethod
+    def _recent_text(entry: dict, days: int, limit: int) -> str:
+        lines = diary_digest_cache.recent_lines(entry, days, limit)
+        return "\n".join(lines) if lines else "No diary records in the last 7 days."
+
+    def latest_record(self) -> str:
+        if not (self.db and self.kid):
+            return "No latest record available (DB not ready)."
+        return self._latest_text(self._digest())
 
+    def recent_lines(self, days: int = 7, limit: int = 50) -> List[str]:
+        """최근 일지 설명 목록 (최신순, 다이제스트 캐시 우선)"""
+        if self._cacheable(days, limit):
+            return diary_digest_cache.recent_lines(self._digest(), days, limit)
+        return [self._describe(r) for r in self._query_recent(days, limit)]
 
-def _needs_personalization(message: str, mode: str) -> bool:
+    def recent_digest(self, days: int = 7, limit: int = 50) -> str:
+        if not (self.db and self.kid):
+            return "Recent diary digest unavailable (DB not ready)."
+        lines = self.recent_lines(days, limit)
+        return "\n".join(lines) if lines else "No diary records in the last 7 days."
+
+    async def _arun(self, key: tuple, method: Callable[["DiaryContextBuilder"], str]) -> str:
+        """
+        동기 조회 로직을 이벤트 루프를 막지 않고 실행 (결과는 key 로 메모).
+        AsyncSession 이면 run_sync(관계 lazy load 포함 asyncpg 로 처리), 동기 세션이면 스레드에서 실행.
+        """
+        async with self._lock:
+            if key not in self._memo:
+                if self.session_factory is not None and self.kid is not None:
+                    async with self.session_factory() as db:
+                        self._memo[key] = await db.run_sync(
+                            lambda sync_db: method(DiaryContextBuilder(self.kid, sync_db))
+                        )
+                elif isinstance(self.db, AsyncSession):
+                    self._memo[key] = await self.db.run_sync(
+                        lambda sync_db: method(DiaryContextBuilder(self.kid, sync_db))
+                    )
+                else:
+                    self._memo[key] = await asyncio.to_thread(method, self)
+            return self._memo[key]
+
+    def _cached_entry(self) -> Optional[dict]:
+        """캐시 적중 시 DB 세션 없이 바로 응답하기 위한 조회"""
+        return diary_digest_cache.get(self.kid.id) if self.kid else None
+
+    async def alatest_record(self) -> str:
+        entry = self._cached_entry()
+        if entry is not None:
+            return self._latest_text(entry)
+        return await self._arun(("latest",), DiaryContextBuilder.latest_record)
+
+    async def arecent_digest(self, days: int = 7, limit: int = 50) -> str:
+        entry = self._cached_entry() if self._cacheable(days, limit) else None
+        if entry is not None:
+            return self._recent_text(entry, days, limit)
+        return await self._arun(("recent", days, limit), lambda builder: builder.recent_digest(days, limit))
+
+
+def _needs_personalization(message: str, mode: str, match: Optional[KeywordMatch] = None) -> bool:
     if not message:
         return False
-    keywords = [
-        "수유", "모유", "분유", "이유식", "식단", "영양", "간식",
-        "수면", "잠", "낮잠", "밤잠", "루틴",
-        "성장", "키", "몸무게", "체중", "머리둘레", "발달",
-        "배변", "기저귀", "설사", "변비",
-    ]
-    return any(k in message for k in keywords) or mode in {"mom", "nutrition"}
+    match = match or match_keywords(message)
+    return match.has("personalization") or mode in {"mom", "nutrition"}
 
 
-def _needs_doctor_handoff(message: str, mode: str) -> bool:
+def _needs_doctor_handoff(message: str, mode: str, match: Optional[KeywordMatch] = None) -> bool:
     if mode not in {"mom", "nutrition"}:
         return False
     if not message:
         return False
-    keywords = [
-        "증상", "진단", "치료", "병", "질환", "의학", "의료",
-        "백내장", "감기", "열", "고열", "구토", "설사", "발진",
-        "경련", "호흡곤란", "통증", "통증이", "상처", "염증",
-        "눈", "시력", "안과",
-    ]
-    return any(k in message for k in keywords)
+    return (match or match_keywords(message)).has("doctor_handoff")
 
 
-def _is_medical_question(message: str) -> bool:
+def _is_medical_question(message: str, match: Optional[KeywordMatch] = None) -> bool:
     if not message:
         return False
-    keywords = [
-        "증상", "진단", "치료", "병", "질환", "의학", "의료",
-        "백내장", "감기", "열", "고열", "구토", "설사", "발진",
-        "경련", "호흡곤란", "통증", "상처", "염증",
-        "눈", "시력", "안과", "검사", "처방", "약",
-    ]
-    return any(k in message for k in keywords)
+    return (match or match_keywords(message)).has("medical")
 
 
-def _is_emotional_support(message: str) -> bool:
+def _is_emotional_support(message: str, match: Optional[KeywordMatch] = None) -> bool:
     if not message:
         return False
-    keywords = [
-        "우울", "불안", "스트레스", "불면", "무기력", "번아웃",
-        "힘들", "지쳐", "외롭", "위로", "공감", "감정", "마음",
-        "산후", "산후우울", "산후우울증", "육아우울",
-    ]
-    return any(k in message for k in keywords)
+    return (match or match_keywords(message)).has("emotional")
 
 
-def _is_kid_info_question(message: str) -> bool:
+def _is_kid_info_question(message: str, match: Optional[KeywordMatch] = None) -> bool:
     if not message:
         return False
-    keywords = [
-        "몇살", "나이", "개월", "생년월일", "성별", "이름", "아기 이름",
-        "우리애", "우리 아이", "아이 정보", "키", "몸무게",
-        "머리둘레", "두위", "성장", "큰편", "작은편", "평균", "비교",
-    ]
-    return any(k in message for k in keywords)
+    return (match or match_keywords(message)).has("kid_info")
 
 
-def _is_growth_compare_question(message: str) -> bool:
+def _is_growth_compare_question(message: str, match: Optional[KeywordMatch] = None) -> bool:
     if not message:
         return False
-    keywords = [
-        "머리둘레", "두위", "성장", "큰편", "작은편", "평균", "비교",
-        "정상", "표준", "백분위",
-    ]
-    return any(k in message for k in keywords)
+    return (match or match_keywords(message)).has("growth_compare")
+
+
+SOURCE_FOOTER_PREFIXES = ("📚 참고", "참고:")
 
 
 def _strip_source_footer(text: str) -> str:
@@ -235,106 +221,119 @@ def _strip_source_footer(text: str) -> str:
     filtered = []
     for line in lines:
         trimmed = line.strip()
-        if trimmed.startswith("📚 참고") or trimmed.startswith("참고:"):
+        if trimmed.startswith(SOURCE_FOOTER_PREFIXES):
             continue
         filtered.append(line)
     return "\n".join(filtered).strip()
 
 
-async def _classify_question(message: str, mode: str) -> dict:
-    if not message:
-        return {"decision": "ambiguous", "target": mode, "reason": "empty message"}
-
-    system = (
-        "You are a router for a childcare assistant. "
-        "Classify the user's question for routing.\n\n"
-        "Categories:\n"
-        "- mom: 육아 일상(수면, 루틴, 놀이, 습관, 생활 팁)\n"
-        "- doctor: 의료/진단/치료/질환/증상/안과/응급\n"
-        "- nutrition: 식단/영양/수유/이유식/알러지/레시피\n"
-        "- other: 위 범주 외\n\n"
-        "Given current_mode, choose the best target category and decision:\n"
-        "- in_scope: clearly fits current_mode\n"
-        "- ambiguous: overlaps current_mode and another category\n"
-        "- off_topic: clearly not current_mode\n\n"
-        "Hard rules:\n"
-        "- If current_mode is mom or nutrition and the question is medical/diagnosis/treatment, "
-        "decision must be off_topic and target must be doctor.\n"
-        "- If current_mode is doctor and question is clearly nutrition/recipe, target nutrition.\n\n"
-        "Return ONLY JSON with keys: decision, target, reason."
-    )
-    prompt = (
-        f"{system}\n\n"
-        f"current_mode: {mode}\n"
-        f"question: {message}"
-    )
-
-    llm = ChatOpenAI(
-        api_key=settings.openai_api_key,
-        model=settings.openai_model,
-        temperature=0.0,
-        max_tokens=200,
-    )
-    try:
-        result = await llm.ainvoke(prompt)
-        content = result.content if hasattr(result, "content") else str(result)
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            match = re.search(r"\{.*\}", content, re.DOTALL)
-            if not match:
-                raise
-            data = json.loads(match.group(0))
-        return {
-            "decision": data.get("decision", "ambiguous"),
-            "target": data.get("target", mode),
-            "reason": data.get("reason", ""),
-        }
-    except Exception:
-        return {"decision": "ambiguous", "target": mode, "reason": "fallback"}
-
+class _FooterStreamFilter:
+    """
+    토큰 스트림에서 출처 줄을 _strip_source_footer 와 같은 기준으로 제거
+    - 줄 앞부분이 출처 접두어와 일치하는 동안만 보류하고, 달라지는 즉시 내보냄 (일반 문장은 지연 없음)
+    """
 
-async def generate_response(
+    def __init__(self):
+        self._pending = ""
+        self._state = "undecided"  # undecided | pass | drop
+
+    def _decide(self) -> None:
+        head = self._pending.lstrip()
+        if head.startswith(SOURCE_FOOTER_PREFIXES):
+            self._state = "drop"
+        elif head and not any(prefix.startswith(head) for prefix in SOURCE_FOOTER_PREFIXES):
+            self._state = "pass"
+
+    def feed(self, text: str) -> str:
+        out = []
+        for i, part in enumerate(text.split("\n")):
+            if i:
+                # 줄 끝: 보류 중이던 줄은 출처 줄이 아니므로 내보냄
+                if self._state != "drop":
+                    out.append(self._pending + "\n")
+                self._pending = ""
+                self._state = "undecided"
+            if self._state == "pass":
+                out.append(part)
+            elif self._state == "undecided":
+                self._pending += part
+                self._decide()
+                if self._state == "pass":
+                    out.append(self._pending)
+                    self._pending = ""
+        return "".join(out)
+
+    def flush(self) -> str:
+        rest = self._pending if self._state == "undecided" else ""
+        self._pending = ""
+        self._state = "undecided"
+        return rest
+
+
+async def _prepare_turn(
     message: str,
     mode: str,
     history: List[dict],
-    kid: Optional[Kid] = None,
-    db: Optional[Session] = None,
+    kid: Optional[Kid],
+    db: Optional[Union[Session, AsyncSession]],
+    session_factory: Optional[async_sessionmaker] = None,
+    history_summary: Optional[str] = None,
 ) -> dict:
     """
-    AI 응답 생성
-    Returns:
-        dict: {
-            "output": str,  # AI 응답
-            "tools_called": List[str],  # 호출된 도구 목록
-            "rag_used": bool,  # RAG 검색 여부
-            "kid_info_used": bool,  # 아이 정보 사용 여부
-        }
+    라우팅/캐시 조회/에이전트 구성까지 수행.
+    바로 응답할 수 있으면 "result" 키에 최종 응답을 담아 반환한다.
     """
-    diary = DiaryContextBuilder(kid, db)
+    diary = DiaryContextBuilder(kid, db, session_factory)
     suggest_mom_note = False
+    # 키워드 매칭은 한 번만 수행하고 라우팅/프롬프트/로그에서 재사용
+    keywords = match_keywords(message)
+    kid_info_override = _is_kid_info_question(message, keywords)
+
+    async def _route() -> dict:
+        if kid_info_override:
+            return {"decision": "in_scope", "target": mode, "reason": "kidinfo_override"}
+        return await question_router.route(message, mode, keywords)
+
+    async def _load_diary() -> Tuple[str, str]:
+        # 같은 DB 세션을 쓰므로 두 쿼리는 순서대로 실행
+        return await diary.alatest_record(), await diary.arecent_digest()
+
+    async def _prefetch_rag() -> Optional[str]:
+        # 에이전트가 어차피 호출할 rag_search 를 미리 실행 (실패 시 에이전트가 직접 호출)
+        if not settings.rag_prefetch_enabled:
+            return None
+        try:
+            snippets = await asyncio.to_thread(rag_search, mode, message)
+        except Exception as exc:
+            print(f"[AI Prefetch] rag_search failed: {exc}")
+            return None
+        return snippets if snippets.startswith("RAG_SNIPPETS") else None
+
+    # 라우팅(LLM) / 일지 조회(DB) / RAG 검색을 동시에 실행
+    routing, (latest_record, recent_digest), prefetched_rag = await asyncio.gather(
+        _route(),
+        _load_diary(),
+        _prefetch_rag(),
+    )
+    decision = routing.get("decision")
+    target = routing.get("target")
+    reason = routing.get("reason", "")
 
-    if _is_kid_info_question(message):
-        decision = "in_scope"
-        target = mode
-        reason = "kidinfo_override"
-    else:
-        routing = await _classify_question(message, mode)
-        decision = routing.get("decision")
-        target = routing.get("target")
-        reason = routing.get("reason", "")
-
-        if mode in {"mom", "nutrition"} and _is_medical_question(message):
+    if not kid_info_override:
+        if mode in {"mom", "nutrition"} and _is_medical_question(message, keywords):
             decision = "off_topic"
             target = "doctor"
             reason = f"{reason}|keyword_override"
 
-        if mode == "mom" and _is_emotional_support(message):
+        if mode == "mom" and _is_emotional_support(message, keywords):
             decision = "in_scope"
             target = "mom"
             reason = f"{reason}|emotional_override"
 
-    print(f"[AI Routing] mode={mode} decision={decision} target={target} reason={reason}")
+    print(
+        f"[AI Routing] mode={mode} decision={decision} target={target} reason={reason} "
+        f"keywords={keywords.categories}"
+    )
 
     if decision == "off_topic":
         if mode == "mom":
@@ -348,38 +347,96 @@ async def generate_response(
             reason = f"{reason}|offtopic_doctor_answer"
         elif mode == "nutrition":
             return {
-                "output": (
-                    "이 질문은 맘 AI가 더 잘 도와줄 수 있어요. "
-                    "맘 AI로 전환해서 상담해보는 걸 추천드려요."
-                ),
-                "tools_called": [],
-                "rag_used": False,
-                "kid_info_used": kid is not None,
+                "routing": {"decision": decision, "target": target, "reason": reason},
+                "result": {
+                    "output": (
+                        "이 질문은 맘 AI가 더 잘 도와줄 수 있어요. "
+                        "맘 AI로 전환해서 상담해보는 걸 추천드려요."
+                    ),
+                    "tools_called": [],
+                    "rag_used": False,
+                    "kid_info_used": kid is not None,
+                },
             }
 
-    tools = [build_rag_tool(mode), *build_diary_tools(diary)]
-    if mode == "nutrition":
-        tools.append(build_web_tool())
+    turn = {
+        "mode": mode,
+        "kid": kid,
+        "diary": diary,
+        "decision": decision,
+        "target": target,
+        "suggest_mom_note": suggest_mom_note,
+        "routing": {
+            "decision": decision,
+            "target": target,
+            "reason": reason,
+            "keywords": keywords.categories,
+        },
+    }
 
     kid_snapshot = diary.kid_snapshot()
-
-    personalize = _needs_personalization(message, mode)
-    executor, chat_history = build_agent(
+    kid_info_used = kid is not None and "No kid selected" not in kid_snapshot
+    turn["kid_info_used"] = kid_info_used
+
+    personalize = _needs_personalization(message, mode, keywords)
+
+    # 아이/일지 정보 없이 실행되는 비개인화 첫 질문만 시맨틱 캐시 조회 (적중 시 에이전트 실행 생략)
+    # 프롬프트에 아이 정보가 들어가면 답변이 그 가정의 기록에 의존하므로 다른 사용자와 공유하지 않음
+    # 맘/영양 모드는 항상 개인화되므로 사실상 닥터 모드 첫 질문만 해당 (response_cache 모듈 설명 참고)
+    cache_key = None
+    query_vector = None
+    if (
+        settings.response_cache_enabled
+        and mode == CACHE_MODE
+        and not kid_info_used
+        and not personalize
+        and not history
+        and not history_summary
+    ):
+        cache_key = (decision or "", target or "", suggest_mom_note, get_index_version(mode))
+        try:
+            query_vector = await asyncio.to_thread(get_embeddings().embed_query, message)
+            cached = response_cache.lookup(cache_key, query_vector)
+        except Exception:
+            cache_key = None
+            cached = None
+        if cached:
+            print(f"[AI Cache] semantic hit mode={mode}")
+            turn["result"] = {**cached, "kid_info_used": kid_info_used}
+            return turn
+    turn["cache_key"] = cache_key
+    turn["query_vector"] = query_vector
+
+    tools = build_mode_tools(mode, diary)
+    executor, prompt_vars = build_agent(
         mode=mode,
         tools=tools,
         kid_snapshot=kid_snapshot,
-        latest_record=diary.latest_record(),
-        recent_digest=diary.recent_digest(),
+        latest_record=latest_record,
+        recent_digest=recent_digest,
         history=history,
+        history_summary=history_summary,
         personalize=personalize,
+        prefetched_rag=prefetched_rag,
     )
-    result = await executor.ainvoke({"input": message, "chat_history": chat_history})
+    turn["rag_prefetched"] = prefetched_rag is not None
+    turn["executor"] = executor
+    turn["agent_input"] = {"input": message, **prompt_vars}
+    return turn
+
+
+def _finalize_turn(turn: dict, result) -> dict:
+    """에이전트 실행 결과 후처리 (도구 호출 분석, 안내 문구, 캐시 저장)"""
+    mode = turn["mode"]
+    decision = turn["decision"]
+    target = turn["target"]
+    kid_info_used = turn["kid_info_used"]
 
     # 도구 호출 내역 분석
     tools_called = []
     rag_used = False
 
-    if "intermediate_steps" in result:
+    if isinstance(result, dict) and "intermediate_steps" in result:
         for step in result["intermediate_steps"]:
             if len(step) >= 1:
                 action = step[0]
@@ -388,11 +445,10 @@ async def generate_response(
                     tools_called.append(tool_name)
                     if tool_name == "rag_search":
                         rag_used = True
+    if turn.get("rag_prefetched"):
+        rag_used = True
 
-    # 아이 정보 사용 여부 (시스템 프롬프트에 포함됨)
-    kid_info_used = kid is not None and "No kid selected" not in kid_snapshot
-
-    output = result.get("output") if isinstance(result, dict) else str(result)
+    output = (result.get("output") or "") if isinstance(result, dict) else str(result)
     output = _strip_source_footer(output)
     if rag_used and "문서 기반" not in output:
         output = f"{output}\n\n이 답변은 신뢰도 있는 문서 기반으로 생성되었어요!"
@@ -403,7 +459,7 @@ async def generate_response(
             f"혹시 이 질문은 {target_label}에서도 더 자세히 다룰 수 있어요. "
             f"{target_label}로도 질문해보실래요?"
         )
-    if suggest_mom_note:
+    if turn["suggest_mom_note"]:
         output = (
             f"{output}\n\n"
             "추가로, 맘 AI가 생활/감정적인 부분까지 더 섬세하게 도와줄 수 있어요."
@@ -418,9 +474,87 @@ async def generate_response(
     print(f"RAG used: {rag_used}")
     print(f"{'='*50}\n")
 
+    # cache_key 는 아이/일지 정보 없이 실행된 턴에만 설정됨 (_prepare_turn)
+    cache_key = turn.get("cache_key")
+    query_vector = turn.get("query_vector")
+    if cache_key and query_vector is not None and not kid_info_used:
+        response_cache.store(
+            cache_key,
+            query_vector,
+            {"output": output, "tools_called": tools_called, "rag_used": rag_used},
+        )
+
     return {
         "output": output,
         "tools_called": tools_called,
         "rag_used": rag_used,
         "kid_info_used": kid_info_used,
     }
+
+
+async def generate_response(
+    message: str,
+    mode: str,
+    history: List[dict],
+    kid: Optional[Kid] = None,
+    db: Optional[Union[Session, AsyncSession]] = None,
+    session_factory: Optional[async_sessionmaker] = None,
+    history_summary: Optional[str] = None,
+) -> dict:
+    """
+    AI 응답 생성
+    Returns:
+        dict: {
+            "output": str,  # AI 응답
+            "tools_called": List[str],  # 호출된 도구 목록
+            "rag_used": bool,  # RAG 검색 여부
+            "kid_info_used": bool,  # 아이 정보 사용 여부
+        }
+    """
+    turn = await _prepare_turn(message, mode, history, kid, db, session_factory, history_summary)
+    if "result" in turn:
+        return turn["result"]
+    result = await turn["executor"].ainvoke(turn["agent_input"])
+    return _finalize_turn(turn, result)
+
+
+async def stream_response(
+    message: str,
+    mode: str,
+    history: List[dict],
+    kid: Optional[Kid] = None,
+    db: Optional[Union[Session, AsyncSession]] = None,
+    session_factory: Optional[async_sessionmaker] = None,
+    history_summary: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """
+    AI 응답 스트리밍
+    이벤트 순서: routing → (tool | token)* → done
+    - token: 모델이 생성하는 답변 조각 (출처 줄은 done 과 같은 기준으로 제외)
+    - done: generate_response 와 같은 형태의 최종 응답 (후처리 문구 포함)
+    """
+    turn = await _prepare_turn(message, mode, history, kid, db, session_factory, history_summary)
+    yield {"event": "routing", "data": turn["routing"]}
+    if "result" in turn:
+        yield {"event": "done", "data": turn["result"]}
+        return
+
+    result = None
+    # done 의 output 과 같은 본문이 되도록 출처 줄은 스트리밍에서도 제외
+    footer_filter = _FooterStreamFilter()
+    async for event in turn["executor"].astream_events(turn["agent_input"], version="v1"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            chunk = event["data"].get("chunk")
+            text = footer_filter.feed(getattr(chunk, "content", "") if chunk is not None else "")
+            if text:
+                yield {"event": "token", "data": {"text": text}}
+        elif kind == "on_tool_start":
+            yield {"event": "tool", "data": {"name": event["name"]}}
+        elif kind == "on_chain_end" and event["name"] == "AgentExecutor":
+            result = event["data"].get("output")
+
+    rest = footer_filter.flush()
+    if rest:
+        yield {"event": "token", "data": {"text": rest}}
+    yield {"event": "done", "data": _finalize_turn(turn, result or {})}
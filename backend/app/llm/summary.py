@@ -1,63 +1,12 @@
-from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.models import Kid, Record
-from app.models.enums import RecordTypeEnum
+from app.models import Kid
 from app.llm.agent import build_llm
-from app.llm.vector_loader import load_mode_stores
-from app.core.config import settings
-
-
-def _format_record(rec: Record) -> str:
-    """일지 1건을 짧게 요약 문자열로 변환."""
-    base = f"{rec.created_at:%Y-%m-%d} [{rec.record_type.value}]"
-    detail = ""
-    if rec.record_type == RecordTypeEnum.growth and rec.growth_record:
-        h = rec.growth_record.height_cm
-        w = rec.growth_record.weight_kg
-        detail = f"키 {h}cm, 몸무게 {w}kg"
-    elif rec.record_type == RecordTypeEnum.health and rec.health_record:
-        temp = rec.health_record.temperature
-        sym = rec.health_record.symptom.value if rec.health_record.symptom else ""
-        detail = f"증상 {sym}, 체온 {temp}"
-    elif rec.record_type == RecordTypeEnum.sleep and rec.sleep_record:
-        detail = f"수면 {rec.sleep_record.start_datetime}~{rec.sleep_record.end_datetime} ({rec.sleep_record.sleep_quality.value})"
-    elif rec.record_type == RecordTypeEnum.meal and rec.meal_record:
-        detail = f"식사 {rec.meal_record.meal_type.value}: {rec.meal_record.meal_detail or ''}"
-    elif rec.record_type == RecordTypeEnum.DIAPER and rec.diaper_record:
-        dr = rec.diaper_record
-        parts = [f"배변 ({dr.diaper_type.value})"]
-        if dr.amount:
-            parts.append(f"양: {dr.amount.value}")
-        if dr.condition:
-            parts.append(f"상태: {dr.condition.value}")
-        if dr.color:
-            parts.append(f"색: {dr.color.value}")
-        detail = ", ".join(parts)
-    else:
-        detail = rec.memo or rec.title or ""
-    return f"{base} :: {detail}".strip()
-
-
-def _recent_records(db: Session, kid: Kid, days: int = 7, limit: int = 80) -> List[Record]:
-    since = datetime.utcnow() - timedelta(days=days)
-    return (
-        db.query(Record)
-        .options(
-            joinedload(Record.growth_record),
-            joinedload(Record.health_record),
-            joinedload(Record.sleep_record),
-            joinedload(Record.meal_record),
-            joinedload(Record.diaper_record),
-        )
-        .filter(Record.kid_id == kid.id, Record.created_at >= since)
-        .order_by(Record.created_at.desc())
-        .limit(limit)
-        .all()
-    )
+from app.llm.service import DiaryContextBuilder
+from app.llm.vector_loader import get_mode_retriever
 
 
 async def generate_weekly_summary(kid: Optional[Kid], db: Optional[Session]) -> str:
@@ -68,15 +17,16 @@ async def generate_weekly_summary(kid: Optional[Kid], db: Optional[Session]) ->
     if not db or not kid:
         return "최근 7일 요약을 만들 수 없습니다 (아이 또는 DB 정보가 없어요)."
 
-    records = _recent_records(db, kid)
+    # 아이별 일지 다이제스트 캐시에서 바로 조회 (미적재 시에만 DB 조회)
+    records = DiaryContextBuilder(kid, db).recent_lines(days=7, limit=80)
     if not records:
         return "최근 7일 동안 등록된 일지 기록이 없습니다."
 
-    record_lines = "\n".join(_format_record(r) for r in records)
+    record_lines = "\n".join(records)
     kid_profile = f"이름: {kid.name}, 생년월일: {kid.birth_date}, 성별: {'남아' if kid.gender == 'male' else '여아'}"
 
-    # RAG: 공통+맘 문서 우선 사용
-    retriever = load_mode_stores(settings.vector_base_dir, ["common_docs", "mom_docs"])
+    # RAG: 공통+맘 문서 우선 사용 (mom 모드 인덱스와 동일 구성)
+    retriever = get_mode_retriever("mom")
     rag_context = ""
     if retriever:
         docs = retriever.invoke("최근 7일 아기 건강/성장/식습관 점검 체크리스트")
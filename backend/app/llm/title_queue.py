@@ -0,0 +1,137 @@
+"""
+채팅 세션 제목 백그라운드 생성
+- 새 세션은 질문 스니펫을 임시 제목으로 바로 저장
+- 대기 중인 세션 여러 개를 모아 LLM 1회 호출로 제목을 만든 뒤 ChatSession.title 갱신
+"""
+import asyncio
+import json
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.llm.agent import build_llm
+from app.models import ChatSession
+
+# (session_id, 질문, 모드, 임시 제목)
+PendingTitle = Tuple[int, str, str, str]
+
+# 세션 목록 UI 기준 제목 최대 길이 (임시 제목/LLM 제목 공통)
+TITLE_MAX_LENGTH = 40
+
+
+def fallback_title(message: str) -> str:
+    """LLM 제목이 생성되기 전(또는 실패 시) 사용하는 임시 제목 (질문 앞부분)"""
+    return message.strip()[:TITLE_MAX_LENGTH]
+
+
+def _parse_titles(content: str, expected: int) -> Optional[List[str]]:
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        match = re.search(r"\[.*\]", content, re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return None
+    if not isinstance(data, list) or len(data) != expected:
+        return None
+    return [str(t).strip()[:TITLE_MAX_LENGTH] for t in data]
+
+
+class TitleQueue:
+    """제목 생성 대기열 + 배치 워커 (워커 프로세스당 1개)"""
+
+    def __init__(self, batch_size: int, batch_window: float):
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stats = {"enqueued": 0, "batches": 0, "updated": 0, "failed": 0}
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    def enqueue(self, session_id: int, message: str, mode: str) -> None:
+        self.start()
+        self._queue.put_nowait((session_id, message, mode, fallback_title(message)))
+        self._stats["enqueued"] += 1
+
+    async def _next_batch(self) -> List[PendingTitle]:
+        """첫 항목을 기다린 뒤 batch_window 동안 최대 batch_size 개까지 모음"""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._process(batch)
+            except Exception as exc:
+                self._stats["failed"] += len(batch)
+                print(f"[AI Title] batch failed size={len(batch)}: {exc}")
+
+    async def _process(self, batch: List[PendingTitle]) -> None:
+        self._stats["batches"] += 1
+        lines = "\n".join(
+            f"{i}. [모드: {mode}] {message}" for i, (_, message, mode, _) in enumerate(batch, 1)
+        )
+        prompt = (
+            "다음 사용자 질문들을 각각 20자 이하의 간단한 주제 한글 명사구로 요약하세요.\n"
+            "입력 순서대로 제목 문자열만 담은 JSON 배열로만 답하세요.\n\n"
+            f"{lines}"
+        )
+        res = await build_llm().ainvoke(prompt)
+        content = res.content if hasattr(res, "content") else str(res)
+        titles = _parse_titles(content or "", len(batch))
+        if titles is None:
+            self._stats["failed"] += len(batch)
+            print(f"[AI Title] unparsable titles for batch size={len(batch)}")
+            return
+
+        async with AsyncSessionLocal() as db:
+            for (session_id, _, _, fallback), title in zip(batch, titles):
+                if not title:
+                    continue
+                # 임시 제목 그대로인 경우만 갱신, 목록 정렬 기준(updated_at)은 유지
+                result = await db.execute(
+                    update(ChatSession)
+                    .where(ChatSession.id == session_id, ChatSession.title == fallback)
+                    .values(title=title, updated_at=ChatSession.updated_at)
+                )
+                self._stats["updated"] += result.rowcount or 0
+            await db.commit()
+
+    def stats(self) -> dict:
+        return {**self._stats, "pending": self._queue.qsize() if self._queue else 0}
+
+
+title_queue = TitleQueue(
+    batch_size=settings.title_batch_size,
+    batch_window=settings.title_batch_window_seconds,
+)
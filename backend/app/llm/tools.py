@@ -3,27 +3,28 @@ import requests
 from langchain_core.tools import Tool
 from typing import Optional
 
-from .vector_loader import load_mode_stores
-from app.core.config import settings
+from .vector_loader import get_mode_retriever
 
 
-def build_rag_tool(mode: str):
-    retriever = load_mode_stores(
-        settings.vector_base_dir, settings.mode_vector_dirs.get(mode, ["mom_docs", "common_docs"])
-    )
+def rag_search(mode: str, q: str) -> str:
+    """모드 전용+공통 문서 검색 결과를 스니펫 문자열로 반환"""
+    retriever = get_mode_retriever(mode)
+    if not retriever:
+        return "Vector DB unavailable."
+    docs = retriever.invoke(q)
+    formatted = []
+    for d in docs:
+        source = None
+        if hasattr(d, "metadata"):
+            source = d.metadata.get("source") or d.metadata.get("file") or d.metadata.get("path")
+        label = os.path.basename(source) if source else "doc"
+        formatted.append(f"[{label}] {d.page_content}")
+    return "RAG_SNIPPETS:\n" + "\n\n".join(formatted) if formatted else "No RAG hits."
 
+
+def build_rag_tool(mode: str):
     def _rag(q: str) -> str:
-        if not retriever:
-            return "Vector DB unavailable."
-        docs = retriever.invoke(q)
-        formatted = []
-        for d in docs:
-            source = None
-            if hasattr(d, "metadata"):
-                source = d.metadata.get("source") or d.metadata.get("file") or d.metadata.get("path")
-            label = os.path.basename(source) if source else "doc"
-            formatted.append(f"[{label}] {d.page_content}")
-        return "RAG_SNIPPETS:\n" + "\n\n".join(formatted) if formatted else "No RAG hits."
+        return rag_search(mode, q)
 
     return Tool.from_function(
         name="rag_search",
@@ -39,9 +40,16 @@ def build_diary_tools(diary_builder):
     def latest(_: str = "") -> str:
         return diary_builder.latest_record()
 
+    # 에이전트 비동기 실행(ainvoke/astream_events) 시 사용 (AsyncSession 지원)
+    async def arecent(_: str = "") -> str:
+        return await diary_builder.arecent_digest()
+
+    async def alatest(_: str = "") -> str:
+        return await diary_builder.alatest_record()
+
     return [
-        Tool.from_function(name="diary_recent", func=recent, description="최근 7일 일지 요약"),
-        Tool.from_function(name="diary_latest", func=latest, description="가장 최근 일지 1건"),
+        Tool.from_function(name="diary_recent", func=recent, coroutine=arecent, description="최근 7일 일지 요약"),
+        Tool.from_function(name="diary_latest", func=latest, coroutine=alatest, description="가장 최근 일지 1건"),
     ]
 
 
@@ -71,3 +79,11 @@ def build_web_tool():
         func=web_search,
         description="영양/레시피 질문 시 보조용 웹검색(duckduckgo)",
     )
+
+
+def build_mode_tools(mode: str, diary_builder) -> list:
+    """모드별 에이전트 도구 목록 (rag + 일지, 영양 모드는 웹검색 추가)"""
+    tools = [build_rag_tool(mode), *build_diary_tools(diary_builder)]
+    if mode == "nutrition":
+        tools.append(build_web_tool())
+    return tools
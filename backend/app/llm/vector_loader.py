@@ -1,7 +1,47 @@
+import hashlib
+import json
+import mmap
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
+from langchain_community.docstore.base import Docstore
 from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_openai import OpenAIEmbeddings
+
+from app.core.config import settings
+from app.llm.clients import get_async_http_client, get_sync_http_client
+from app.llm.embedding_cache import CachedQueryEmbeddings, build_remote_tier
+
+# 오프라인 빌드 산출물 파일 접미사 (app/llm/index_builder.py)
+INDEX_SUFFIX = ".faiss"
+# 문서 저장소: FAISS 위치 순서대로 한 줄에 문서 1건(JSON) + 각 줄의 시작 바이트 오프셋(uint64, 건수 + 1개)
+DOCSTORE_SUFFIX = ".docstore.jsonl"
+DOCSTORE_OFFSETS_SUFFIX = ".docstore.offsets.npy"
+MANIFEST_SUFFIX = ".manifest.json"
+
+
+@lru_cache
+def get_embeddings() -> CachedQueryEmbeddings:
+    """쿼리 임베딩용 클라이언트 (프로세스당 1개, 쿼리 임베딩 캐시 포함)"""
+    inner = OpenAIEmbeddings(
+        api_key=settings.openai_api_key,
+        model=settings.openai_embedding_model,
+        timeout=settings.llm_timeout_seconds,
+        max_retries=settings.llm_max_retries,
+        http_client=get_sync_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+    return CachedQueryEmbeddings(
+        inner,
+        model=settings.openai_embedding_model,
+        max_size=settings.embedding_cache_size,
+        remote=build_remote_tier(),
+    )
 
 
 def _load_single_store(pkl_path: Path) -> Optional[FAISS]:
@@ -10,6 +50,7 @@ def _load_single_store(pkl_path: Path) -> Optional[FAISS]:
     # pkl 파일은 FAISS 저장본. dangerous_deserialization 필요.
     return FAISS.load_local(
         pkl_path.with_suffix(""),
+        embeddings=get_embeddings(),
         allow_dangerous_deserialization=True,
     )
 
@@ -18,7 +59,7 @@ def load_faiss_from_dir(dir_path: Path) -> Optional[FAISS]:
     if not dir_path.exists():
         return None
     stores = []
-    for pkl in dir_path.glob("*.pkl"):
+    for pkl in sorted(dir_path.glob("*.pkl")):
         store = _load_single_store(pkl)
         if store:
             stores.append(store)
@@ -30,7 +71,7 @@ def load_faiss_from_dir(dir_path: Path) -> Optional[FAISS]:
     return base
 
 
-def load_mode_stores(base_dir: Path, folders: List[str]):
+def _merge_folders(base_dir: Path, folders: List[str]) -> Optional[FAISS]:
     stores = []
     for name in folders:
         store = load_faiss_from_dir(base_dir / name)
@@ -41,4 +82,229 @@ def load_mode_stores(base_dir: Path, folders: List[str]):
     base = stores[0]
     for other in stores[1:]:
         base.merge_from(other)
-    return base.as_retriever(search_kwargs={"k": 4})
+    return base
+
+
+def load_mode_stores(base_dir: Path, folders: List[str]):
+    """폴더 목록의 FAISS 저장본을 매번 새로 읽어 병합 (캐시 없음)."""
+    store = _merge_folders(base_dir, folders)
+    if store is None:
+        return None
+    return store.as_retriever(search_kwargs={"k": 4})
+
+
+# =============================================================================
+# Prebuilt Index (모드별 병합 인덱스, mmap 로드)
+# =============================================================================
+def _prebuilt_paths(index_dir: Path, mode: str) -> Tuple[Path, Path, Path]:
+    return (
+        index_dir / f"{mode}{INDEX_SUFFIX}",
+        index_dir / f"{mode}{DOCSTORE_SUFFIX}",
+        index_dir / f"{mode}{DOCSTORE_OFFSETS_SUFFIX}",
+    )
+
+
+class _PositionIds(Mapping):
+    """FAISS 위치 → 문서 저장소 ID. 위치 자체를 ID 로 쓰므로 dict 를 만들지 않음"""
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def __getitem__(self, position: int) -> str:
+        if not 0 <= position < self.size:
+            raise KeyError(position)
+        return str(position)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.size))
+
+
+class MmapDocstore(Docstore):
+    """
+    읽기 전용 mmap 문서 저장소
+    - search 로 요청된 문서 줄만 그때그때 파싱 (전체 JSON 을 워커마다 적재하지 않음)
+    - 파일 페이지는 OS 페이지 캐시에서 워커 간 공유
+    """
+
+    def __init__(self, docs_path: Path, offsets_path: Path):
+        self._data = b""
+        if docs_path.stat().st_size:
+            with open(docs_path, "rb") as f:
+                # 파일을 닫아도 매핑은 유지됨
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = np.load(offsets_path, mmap_mode="r")
+        if len(self._offsets) < 1 or int(self._offsets[-1]) != len(self._data):
+            raise ValueError(f"docstore offsets do not match {docs_path.name}")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def search(self, search: str):
+        try:
+            position = int(search)
+        except (TypeError, ValueError):
+            return f"ID {search} not found."
+        if not 0 <= position < len(self):
+            return f"ID {search} not found."
+        start, end = int(self._offsets[position]), int(self._offsets[position + 1])
+        item = json.loads(self._data[start:end])
+        return Document(page_content=item["page_content"], metadata=item.get("metadata") or {})
+
+
+def load_prebuilt_store(index_dir: Path, mode: str) -> Optional[FAISS]:
+    """
+    index_builder 가 만든 <mode>.faiss 와 문서 저장소를 읽기 전용 mmap 으로 연다.
+    같은 파일을 여는 워커들은 OS 페이지 캐시를 공유한다.
+    """
+    index_path, docs_path, offsets_path = _prebuilt_paths(index_dir, mode)
+    if not all(path.exists() for path in (index_path, docs_path, offsets_path)):
+        return None
+
+    import faiss
+
+    try:
+        index = faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        # mmap 을 지원하지 않는 인덱스 타입이면 일반 로드
+        index = faiss.read_index(str(index_path))
+
+    try:
+        docstore = MmapDocstore(docs_path, offsets_path)
+    except ValueError as exc:
+        # 재빌드 도중 파일이 엇갈려 읽힌 경우 (파일이 바뀌면 레지스트리가 다시 로드)
+        print(f"[VectorLoader] prebuilt mode={mode} docstore ignored: {exc}")
+        return None
+    if len(docstore) != index.ntotal:
+        print(f"[VectorLoader] prebuilt mode={mode} docstore/index size mismatch, ignored")
+        return None
+
+    return FAISS(
+        embedding_function=get_embeddings(),
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=_PositionIds(index.ntotal),
+    )
+
+
+def _prebuilt_signature(index_dir: Path, mode: str) -> Tuple:
+    entries = []
+    for path in _prebuilt_paths(index_dir, mode):
+        try:
+            entries.append((str(path), path.stat().st_mtime_ns))
+        except OSError:
+            return ()
+    return tuple(entries)
+
+
+def get_index_version(mode: str) -> str:
+    """
+    모드 인덱스의 빌드 버전. 빌드 산출물이 있으면 manifest 의 version,
+    없으면 원본 저장본 파일 목록/mtime 해시. 문서가 바뀌면 값이 달라진다.
+    """
+    manifest_path = settings.vector_index_dir / f"{mode}{MANIFEST_SUFFIX}"
+    if manifest_path.exists():
+        try:
+            return json.loads(manifest_path.read_text(encoding="utf-8"))["version"]
+        except (ValueError, KeyError, OSError):
+            pass
+    folders = settings.mode_vector_dirs.get(mode, ["mom_docs", "common_docs"])
+    signature = _folders_signature(settings.vector_base_dir, folders)
+    return hashlib.sha1(repr(signature).encode("utf-8")).hexdigest()[:12]
+
+
+# =============================================================================
+# Retriever Registry (프로세스 전역 캐시)
+# =============================================================================
+def _folders_signature(base_dir: Path, folders: List[str]) -> Tuple:
+    """폴더 내 저장본 파일들의 (경로, mtime) 목록. 파일이 바뀌면 값이 달라진다."""
+    entries = []
+    for name in folders:
+        dir_path = base_dir / name
+        if not dir_path.exists():
+            continue
+        for path in sorted(dir_path.iterdir()):
+            try:
+                entries.append((str(path), path.stat().st_mtime_ns))
+            except OSError:
+                continue
+    return tuple(entries)
+
+
+class RetrieverRegistry:
+    """
+    폴더 조합별로 병합된 FAISS 스토어를 한 번만 로드해 공유.
+    - 요청마다 .pkl 역직렬화/merge_from 을 반복하지 않음
+    - 저장본 파일의 mtime 이 바뀐 경우에만 다시 로드 (hot reload)
+    """
+
+    def __init__(self, k: int = 4):
+        self.k = k
+        self._stores: Dict[Tuple[str, Tuple[str, ...]], Tuple[Tuple, Optional[FAISS]]] = {}
+        self._lock = threading.Lock()
+
+    def get_store(self, base_dir: Path, folders: List[str]) -> Optional[FAISS]:
+        key = (str(base_dir), tuple(folders))
+        signature = _folders_signature(base_dir, folders)
+        cached = self._stores.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        with self._lock:
+            # 다른 스레드가 먼저 로드했을 수 있으므로 재확인
+            cached = self._stores.get(key)
+            if cached and cached[0] == signature:
+                return cached[1]
+            store = _merge_folders(base_dir, folders)
+            self._stores[key] = (signature, store)
+            return store
+
+    def get_prebuilt_store(self, index_dir: Path, mode: str) -> Optional[FAISS]:
+        signature = _prebuilt_signature(index_dir, mode)
+        if not signature:
+            return None
+        key = (str(index_dir), ("prebuilt", mode))
+        cached = self._stores.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        with self._lock:
+            cached = self._stores.get(key)
+            if cached and cached[0] == signature:
+                return cached[1]
+            store = load_prebuilt_store(index_dir, mode)
+            self._stores[key] = (signature, store)
+            return store
+
+    def get_retriever(self, base_dir: Path, folders: List[str]):
+        store = self.get_store(base_dir, folders)
+        if store is None:
+            return None
+        return store.as_retriever(search_kwargs={"k": self.k})
+
+    def get_mode_retriever(self, mode: str):
+        """빌드된 병합 인덱스가 있으면 우선 사용, 없으면 폴더별 저장본 병합."""
+        store = self.get_prebuilt_store(settings.vector_index_dir, mode)
+        if store is not None:
+            return store.as_retriever(search_kwargs={"k": self.k})
+        folders = settings.mode_vector_dirs.get(mode, ["mom_docs", "common_docs"])
+        return self.get_retriever(settings.vector_base_dir, folders)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stores.clear()
+
+
+retriever_registry = RetrieverRegistry()
+
+
+def get_cached_retriever(base_dir: Path, folders: List[str]):
+    """프로세스 전역 레지스트리에서 리트리버 반환 (mtime 변경 시 자동 재로드)."""
+    return retriever_registry.get_retriever(base_dir, folders)
+
+
+def get_mode_retriever(mode: str):
+    """모드(mom/doctor/nutrition)별 캐시된 리트리버 반환."""
+    return retriever_registry.get_mode_retriever(mode)
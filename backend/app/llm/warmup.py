@@ -0,0 +1,76 @@
+"""
+워커 기동 시 AI 경로 예열
+- 모드별 벡터 스토어 선로딩 (FAISS 역직렬화)
+- LangChain/OpenAI 클라이언트 생성, 모드별 에이전트/프롬프트 컴파일
+- 더미 임베딩 검색 1회
+"""
+import time
+from typing import Dict, Any
+
+from app.core.config import settings
+from app.llm.agent import build_llm, get_compiled_agent
+from app.llm.history import count_tokens
+from app.llm.router import question_router
+from app.llm.tools import build_mode_tools
+from app.llm.vector_loader import get_mode_retriever
+
+
+def warm_up() -> Dict[str, Any]:
+    """
+    동기 예열 작업. 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+    개별 단계가 실패해도 나머지는 계속 진행하고, 결과를 dict 로 반환한다.
+    """
+    started = time.perf_counter()
+    report: Dict[str, Any] = {"modes": {}, "llm": False, "agents": False, "embedding": False, "router": False}
+
+    retriever = None
+    for mode in settings.mode_vector_dirs:
+        try:
+            mode_retriever = get_mode_retriever(mode)
+            report["modes"][mode] = mode_retriever is not None
+            retriever = retriever or mode_retriever
+        except Exception as exc:
+            report["modes"][mode] = False
+            print(f"[Warmup] vector store load failed mode={mode}: {exc}")
+
+    try:
+        build_llm()
+        report["llm"] = True
+    except Exception as exc:
+        print(f"[Warmup] llm client build failed: {exc}")
+
+    # 히스토리 토큰 계산용 tiktoken 인코딩 로드 (최초 1회 BPE 파일 로드)
+    try:
+        count_tokens("warmup")
+    except Exception as exc:
+        print(f"[Warmup] tiktoken load failed: {exc}")
+
+    # 요청 경로에서 프롬프트/에이전트 생성 비용을 없애기 위해 미리 컴파일 (도구 스키마만 필요)
+    try:
+        for mode in settings.mode_vector_dirs:
+            tools = build_mode_tools(mode, None)
+            for prefetched in (False, True):
+                get_compiled_agent(mode, tools, prefetched)
+        report["agents"] = True
+    except Exception as exc:
+        print(f"[Warmup] agent compile failed: {exc}")
+
+    # 임베딩 API 키가 없으면 더미 검색은 건너뜀
+    if retriever is not None and settings.openai_api_key:
+        try:
+            retriever.invoke("아기 수면")
+            report["embedding"] = True
+        except Exception as exc:
+            print(f"[Warmup] dummy embedding lookup failed: {exc}")
+
+    # 라우터 라벨 임베딩 중심 계산
+    if settings.local_router_enabled and settings.openai_api_key:
+        try:
+            question_router.centroids()
+            report["router"] = True
+        except Exception as exc:
+            print(f"[Warmup] router centroids failed: {exc}")
+
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000)
+    print(f"[Warmup] done {report}")
+    return report
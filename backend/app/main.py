@@ -1,17 +1,32 @@
-from typing import List
+import asyncio
+import json
+import re
+import secrets
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.api import api_router
-from app.llm.service import generate_response
+from app.llm.service import generate_response, stream_response
 from app.schemas import ChatRequest, ChatResponse
-from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.database import AsyncSessionLocal, async_engine, pool_metrics
+from app.core.security import get_current_user_detached
+from app.crud.kid import get_kid_by_user_async, get_latest_kid_by_user_async
 from app.models import Kid, ChatSession, ChatMessage, User
-from app.llm.agent import build_llm
+from app.llm.clients import close_clients
+from app.llm.warmup import warm_up
+from app.llm.vector_loader import get_embeddings
+from app.llm.response_cache import response_cache
+from app.llm.diary_cache import diary_digest_cache
+from app.llm.history import load_history_window
+from app.llm.router import question_router
+from app.llm.title_queue import fallback_title, title_queue
 
 
 def get_cors_origins() -> List[str]:
@@ -30,11 +45,137 @@ def get_cors_origins() -> List[str]:
     return origins
 
 
+# =============================================================================
+# AI Chat Helpers
+# =============================================================================
+async def _resolve_kid(db: AsyncSession, req: ChatRequest, current_user: User) -> Optional[Kid]:
+    """반드시 현재 로그인 유저의 아이만 사용"""
+    kid = None
+    if req.kid_id:
+        kid = await get_kid_by_user_async(db, req.kid_id, current_user.id)
+    if kid is None:
+        kid = await get_latest_kid_by_user_async(db, current_user.id)
+    return kid
+
+
+async def _load_kid(req: ChatRequest, current_user: User) -> Optional[Kid]:
+    """1단계: 짧은 세션으로 아이 조회 후 커넥션 반납"""
+    async with AsyncSessionLocal() as db:
+        return await _resolve_kid(db, req, current_user)
+
+
+async def _persist_chat(
+    req: ChatRequest,
+    current_user: User,
+    kid: Optional[Kid],
+    reply: str,
+) -> ChatSession:
+    """
+    3단계: 세션/메시지 저장 (없으면 생성)
+    LLM 호출이 모두 끝난 뒤 짧은 트랜잭션으로만 커넥션을 사용
+    새 세션은 질문 스니펫을 임시 제목으로 저장하고, 실제 제목은 백그라운드에서 갱신
+    다른 유저의 session_id 면 이어 쓰지 않고 새 세션 생성 (히스토리 조회와 동일하게 무시)
+    """
+    created = False
+    async with AsyncSessionLocal() as db:
+        session = None
+        if req.session_id:
+            session = await db.get(ChatSession, req.session_id)
+            if session is not None and session.user_id != current_user.id:
+                session = None
+        if session is None:
+            session = ChatSession(
+                user_id=current_user.id,
+                mode=req.mode,
+                kid_id=(kid.id if kid else req.kid_id),
+                title=fallback_title(req.message),
+                question_snippet=req.message[:80],
+                date_label=datetime.utcnow().strftime("%m.%d"),
+            )
+            db.add(session)
+            await db.flush()  # session.id 확보
+            created = True
+
+        # 메시지 기록 (user, ai)
+        db.add_all(
+            [
+                ChatMessage(session_id=session.id, sender="user", content=req.message),
+                ChatMessage(session_id=session.id, sender="ai", content=reply),
+            ]
+        )
+        session.updated_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(session)
+    if created:
+        title_queue.enqueue(session.id, req.message, req.mode)
+    return session
+
+
+def _chat_payload(req: ChatRequest, session: ChatSession, kid: Optional[Kid], response_data: dict) -> dict:
+    """ChatResponse 형태의 응답 dict 생성"""
+    reply = response_data["output"]
+
+    # RAG 참조 문서 추출 (📚 참고: [문서명] 패턴)
+    references = []
+    ref_pattern = r'📚\s*참고:\s*\[([^\]]+)\]'
+    matches = re.findall(ref_pattern, reply)
+    if matches:
+        references = list(set(matches))  # 중복 제거
+
+    return {
+        "reply": reply,
+        "session_id": session.id,
+        "mode": req.mode,
+        "date_label": session.date_label or datetime.utcnow().strftime("%m.%d"),
+        "title": session.title,
+        "question_snippet": session.question_snippet,
+        "kid_id": kid.id if kid else None,
+        "kid_name": kid.name if kid else None,
+        "references": references if references else None,
+        # 디버그 정보 (개발 중에만 사용, 나중에 제거 가능)
+        "_debug": {
+            "tools_called": response_data.get("tools_called", []),
+            "rag_used": response_data.get("rag_used", False),
+            "kid_info_used": response_data.get("kid_info_used", False),
+        }
+    }
+
+
+def _sse(event: str, data) -> str:
+    """Server-Sent Events 한 건 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """워커 기동 시 AI 경로 예열. 완료 전까지 /health 는 준비 중(503)을 반환."""
+    app.state.ready = not settings.warmup_on_startup
+    app.state.warmup = None
+
+    async def _run_warmup():
+        try:
+            app.state.warmup = await asyncio.to_thread(warm_up)
+        except Exception as exc:
+            print(f"[Warmup] failed: {exc}")
+        finally:
+            app.state.ready = True
+
+    task = asyncio.create_task(_run_warmup()) if settings.warmup_on_startup else None
+    title_queue.start()
+    yield
+    if task and not task.done():
+        task.cancel()
+    await title_queue.stop()
+    await close_clients()
+    await async_engine.dispose()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title="Todoc API",
         version="0.1.0",
-        description="육아 기록 및 커뮤니티 API"
+        description="육아 기록 및 커뮤니티 API",
+        lifespan=lifespan,
     )
 
     # CORS 설정 - 배포/개발 환경 모두 지원
@@ -52,105 +193,93 @@ def create_app() -> FastAPI:
     app.include_router(api_router)
 
     @app.get("/health")
-    def health_check() -> dict:
-        return {"status": "ok"}
+    def health_check():
+        if not getattr(app.state, "ready", True):
+            return JSONResponse(status_code=503, content={"status": "warming_up"})
+        return {"status": "ready", "warmup": getattr(app.state, "warmup", None)}
+
+    @app.get("/metrics")
+    def metrics(x_metrics_token: Optional[str] = Header(default=None)) -> dict:
+        """AI 경로 캐시/성능 지표, DB 커넥션 풀 현황 (METRICS_TOKEN 설정 + 헤더 일치 시에만)"""
+        expected = settings.metrics_token
+        if not expected or not secrets.compare_digest(x_metrics_token or "", expected):
+            raise HTTPException(status_code=404)
+        return {
+            "db_pool": pool_metrics(),
+            "embedding_cache": get_embeddings().stats(),
+            "diary_cache": diary_digest_cache.stats(),
+            "response_cache": response_cache.stats(),
+            "router": question_router.stats(),
+            "title_queue": title_queue.stats(),
+        }
 
     @app.post("/api/ai/chat", response_model=ChatResponse)
     async def ai_chat(
         req: ChatRequest,
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user),
+        current_user: User = Depends(get_current_user_detached),
     ):
-        # 반드시 현재 로그인 유저의 아이만 사용
-        kid = None
-        if req.kid_id:
-            kid = db.query(Kid).filter(Kid.id == req.kid_id, Kid.user_id == current_user.id).first()
-        if kid is None:
-            kid = db.query(Kid).filter(Kid.user_id == current_user.id).order_by(Kid.created_at.desc()).first()
-
-        async def _summarize_title(msg: str, mode: str) -> str:
-            """LLM으로 주제 한 줄(<=20자) 요약."""
-            try:
-                llm = build_llm()
-                prompt = (
-                    "다음 사용자의 질문을 20자 이하의 간단한 주제 한글 명사구로 요약하세요.\n"
-                    f"[모드: {mode}]\n"
-                    f"[질문]: {msg}"
-                )
-                res = await llm.ainvoke(prompt)
-                text = res.content if hasattr(res, "content") else str(res)
-                return (text or "").strip()[:40]
-            except Exception:
-                return msg[:32]
+        """
+        요청 전체에서 DB 커넥션을 붙잡지 않도록 단계별 짧은 트랜잭션으로 처리
+        1) 아이/히스토리 조회 → 2) LLM (일지 조회는 필요할 때 별도 짧은 세션) → 3) 저장
+        """
+        kid, window = await asyncio.gather(
+            _load_kid(req, current_user),
+            load_history_window(req.session_id, current_user.id, req.mode, req.history),
+        )
 
         response_data = await generate_response(
             message=req.message,
             mode=req.mode,
-            history=req.history,
+            history=window.messages,
             kid=kid,
-            db=db,
+            session_factory=AsyncSessionLocal,
+            history_summary=window.summary,
         )
 
-        reply = response_data["output"]
-        tools_called = response_data.get("tools_called", [])
-        rag_used = response_data.get("rag_used", False)
-        kid_info_used = response_data.get("kid_info_used", False)
+        session = await _persist_chat(req, current_user, kid, response_data["output"])
+        return _chat_payload(req, session, kid, response_data)
 
-        # 세션/메시지 저장 (없으면 생성)
-        from datetime import datetime
+    @app.post("/api/ai/chat/stream")
+    async def ai_chat_stream(
+        req: ChatRequest,
+        current_user: User = Depends(get_current_user_detached),
+    ):
+        """
+        SSE 스트리밍 채팅
+        event: routing | tool | token | done (done 의 data 는 /api/ai/chat 응답과 동일)
+        세션/메시지 저장은 스트림이 끝난 뒤 수행
+        """
 
-        session = None
-        if req.session_id:
-            session = db.query(ChatSession).get(req.session_id)
-        if session is None:
-            title_text = await _summarize_title(req.message, req.mode)
-            session = ChatSession(
-                user_id=current_user.id,
-                mode=req.mode,
-                kid_id=(kid.id if kid else req.kid_id),
-                title=title_text,
-                question_snippet=req.message[:80],
-                date_label=datetime.utcnow().strftime("%m.%d"),
-            )
-            db.add(session)
-            db.flush()  # session.id 확보
+        async def _events():
+            # 스트리밍 동안에는 커넥션을 보유하지 않고, 단계별로 짧은 세션만 사용
+            try:
+                kid, window = await asyncio.gather(
+                    _load_kid(req, current_user),
+                    load_history_window(req.session_id, current_user.id, req.mode, req.history),
+                )
+                async for event in stream_response(
+                    message=req.message,
+                    mode=req.mode,
+                    history=window.messages,
+                    kid=kid,
+                    session_factory=AsyncSessionLocal,
+                    history_summary=window.summary,
+                ):
+                    if event["event"] != "done":
+                        yield _sse(event["event"], event["data"])
+                        continue
+                    response_data = event["data"]
+                    session = await _persist_chat(req, current_user, kid, response_data["output"])
+                    yield _sse("done", _chat_payload(req, session, kid, response_data))
+            except Exception as exc:
+                print(f"[AI Stream] failed: {exc}")
+                yield _sse("error", {"detail": "응답 생성 중 오류가 발생했습니다"})
 
-        # 메시지 기록 (user, ai)
-        db.add_all(
-            [
-                ChatMessage(session_id=session.id, sender="user", content=req.message),
-                ChatMessage(session_id=session.id, sender="ai", content=reply),
-            ]
+        return StreamingResponse(
+            _events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
-        session.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(session)
-
-        # RAG 참조 문서 추출 (📚 참고: [문서명] 패턴)
-        import re
-        references = []
-        ref_pattern = r'📚\s*참고:\s*\[([^\]]+)\]'
-        matches = re.findall(ref_pattern, reply)
-        if matches:
-            references = list(set(matches))  # 중복 제거
-
-        return {
-            "reply": reply,
-            "session_id": session.id,
-            "mode": req.mode,
-            "date_label": session.date_label or datetime.utcnow().strftime("%m.%d"),
-            "title": session.title,
-            "question_snippet": session.question_snippet,
-            "kid_id": kid.id if kid else None,
-            "kid_name": kid.name if kid else None,
-            "references": references if references else None,
-            # 디버그 정보 (개발 중에만 사용, 나중에 제거 가능)
-            "_debug": {
-                "tools_called": tools_called,
-                "rag_used": rag_used,
-                "kid_info_used": kid_info_used,
-            }
-        }
 
     return app
 
@@ -12,6 +12,7 @@ class ChatSession(Base):
     - title/question_snippet/date_label: 지난 채팅 카드 요약에 사용
     - mode: mom | doctor | nutrition
     - kid_id: 선택적으로 해당 아이와 연결
+    - history_summary/summary_until_id: 프롬프트 윈도우 밖 오래된 대화의 누적 요약과 반영된 마지막 메시지 id
     """
 
     __tablename__ = "chat_sessions"
@@ -23,6 +24,8 @@ class ChatSession(Base):
     question_snippet = Column(String(500), nullable=True)
     date_label = Column(String(50), nullable=True)  # 예: "01.25 어제"
     kid_id = Column(Integer, nullable=True, index=True)
+    history_summary = Column(Text, nullable=True)
+    summary_until_id = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -27,6 +27,16 @@ from app.models.enums import (
 if TYPE_CHECKING:
     from app.models.kid import Kid
 
+# record_type -> 해당 상세(서브타입) 관계 속성명. 기록 1건에는 자기 타입의 상세 행만 존재
+DETAIL_RELATIONS = {
+    RecordTypeEnum.SLEEP: "sleep_record",
+    RecordTypeEnum.GROWTH: "growth_record",
+    RecordTypeEnum.MEAL: "meal_record",
+    RecordTypeEnum.HEALTH: "health_record",
+    RecordTypeEnum.DIAPER: "diaper_record",
+    RecordTypeEnum.ETC: "etc_record",
+}
+
 
 class Record(Base):
     """기록 기본 테이블"""
@@ -59,6 +69,11 @@ class Record(Base):
     diaper_record: Mapped[Optional["DiaperRecord"]] = relationship("DiaperRecord", back_populates="record", uselist=False, cascade="all, delete-orphan")
     etc_record: Mapped[Optional["EtcRecord"]] = relationship("EtcRecord", back_populates="record", uselist=False, cascade="all, delete-orphan")
 
+    @property
+    def detail(self):
+        """record_type 에 해당하는 상세 기록 (다른 상세 관계는 조회하지 않음)"""
+        return getattr(self, DETAIL_RELATIONS[self.record_type])
+
 
 class SleepRecord(Base):
     """수면 기록"""
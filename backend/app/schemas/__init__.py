@@ -47,6 +47,9 @@ from app.schemas.record import (
     EtcRecordResponse,
     RecordWithDetailsResponse,
     RecordListResponse,
+    BulkRecordRequest,
+    BulkRecordItemResult,
+    BulkRecordResponse,
     SleepSummary,
     GrowthSummary,
     MealSummary,
@@ -54,6 +57,10 @@ from app.schemas.record import (
     DiaperSummary,
     EtcSummary,
     DailySummaryResponse,
+    SleepStatsBucket,
+    MealStatsBucket,
+    DiaperStatsBucket,
+    RecordStatsResponse,
 )
 
 from app.schemas.community import (
@@ -125,6 +132,9 @@ __all__ = [
     "EtcRecordResponse",
     "RecordWithDetailsResponse",
     "RecordListResponse",
+    "BulkRecordRequest",
+    "BulkRecordItemResult",
+    "BulkRecordResponse",
     "SleepSummary",
     "GrowthSummary",
     "MealSummary",
@@ -132,6 +142,10 @@ __all__ = [
     "DiaperSummary",
     "EtcSummary",
     "DailySummaryResponse",
+    "SleepStatsBucket",
+    "MealStatsBucket",
+    "DiaperStatsBucket",
+    "RecordStatsResponse",
     # Community
     "PostCreate",
     "PostUpdate",
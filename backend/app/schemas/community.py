@@ -97,6 +97,7 @@ class PostListResponse(BaseModel):
     page: int
     limit: int
     has_next: bool = Field(..., description="다음 페이지 존재 여부")
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서 (created_at/likes_count/comment_count 정렬 시)")
 
 
 # =============================================================================
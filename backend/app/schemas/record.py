@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from decimal import Decimal
 
 from app.models.enums import (
@@ -374,6 +374,37 @@ class RecordListResponse(BaseModel):
     total: int
     page: int
     limit: int
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서 (없으면 마지막 페이지)")
+
+
+# =============================================================================
+# Bulk Create (일괄 생성)
+# =============================================================================
+class BulkRecordRequest(BaseModel):
+    """기록 일괄 생성 요청 (타입 혼합)"""
+    records: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="항목별 record_type + 해당 타입 생성 필드 (선택: client_id)"
+    )
+
+
+class BulkRecordItemResult(BaseModel):
+    """일괄 생성 항목별 결과"""
+    index: int = Field(..., description="요청 records 내 위치")
+    client_id: Optional[str] = Field(None, description="요청 항목의 client_id (동기화 매칭용)")
+    record_type: Optional[RecordTypeEnum] = None
+    success: bool
+    record_id: Optional[int] = None
+    errors: Optional[List[str]] = Field(None, description="검증 실패 사유")
+
+
+class BulkRecordResponse(BaseModel):
+    """기록 일괄 생성 응답"""
+    created: int
+    failed: int
+    results: List[BulkRecordItemResult]
 
 
 # =============================================================================
@@ -428,3 +459,49 @@ class DailySummaryResponse(BaseModel):
     health: Optional[HealthSummary] = None
     diaper: Optional[DiaperSummary] = None
     etc: Optional[EtcSummary] = None
+
+
+# =============================================================================
+# Record Stats Response (기간 집계 - 차트용)
+# =============================================================================
+class SleepStatsBucket(BaseModel):
+    """수면 집계 (기간 1칸)"""
+    bucket: date = Field(..., description="기간 시작일 (주 단위는 월요일)")
+    count: int
+    total_hours: float
+    avg_daily_hours: float = Field(..., description="기록 있는 날 기준 일평균 수면 시간")
+    nap_count: int
+    night_count: int
+    days_with_records: int
+
+
+class MealStatsBucket(BaseModel):
+    """식사 집계 (기간 1칸)"""
+    bucket: date = Field(..., description="기간 시작일 (주 단위는 월요일)")
+    count: int
+    total_ml: int
+    avg_ml_per_feed: Optional[float] = Field(None, description="양(ml) 기록이 있는 식사 기준 평균")
+    avg_daily_count: float = Field(..., description="기록 있는 날 기준 일평균 식사 횟수")
+    days_with_records: int
+
+
+class DiaperStatsBucket(BaseModel):
+    """배변 집계 (기간 1칸)"""
+    bucket: date = Field(..., description="기간 시작일 (주 단위는 월요일)")
+    count: int
+    stool_count: int
+    urine_count: int
+    diarrhea_count: int
+    avg_daily_stool: float = Field(..., description="기록 있는 날 기준 일평균 대변 횟수")
+    days_with_records: int
+
+
+class RecordStatsResponse(BaseModel):
+    """기간별 기록 집계 응답"""
+    kid_id: int
+    bucket: str = Field(..., description="집계 단위 (day | week)")
+    start_date: date
+    end_date: date
+    sleep: List[SleepStatsBucket]
+    meal: List[MealStatsBucket]
+    diaper: List[DiaperStatsBucket]
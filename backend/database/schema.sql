@@ -163,6 +163,8 @@ CREATE INDEX idx_records_kid_id ON records(kid_id);
 CREATE INDEX idx_records_record_date ON records(record_date);
 CREATE INDEX idx_records_record_type ON records(record_type);
 CREATE INDEX idx_records_kid_date ON records(kid_id, record_date);
+-- 목록 키셋 페이지네이션 (record_date, created_at, id) 역순
+CREATE INDEX idx_records_kid_page ON records(kid_id, record_date DESC, created_at DESC, id DESC);
 
 -- 7-2. 수면 기록 테이블
 -- 근거: app/schemas/record.py:64-75 (SleepRecordResponse)
@@ -271,6 +273,9 @@ CREATE INDEX idx_posts_user_id ON posts(user_id);
 CREATE INDEX idx_posts_kid_id ON posts(kid_id) WHERE kid_id IS NOT NULL;
 CREATE INDEX idx_posts_category ON posts(category);
 CREATE INDEX idx_posts_created_at ON posts(created_at DESC);
+-- 목록 키셋 페이지네이션 (정렬 컬럼, id)
+CREATE INDEX idx_posts_created_page ON posts(created_at DESC, id DESC);
+CREATE INDEX idx_posts_likes_page ON posts(likes_count DESC, id DESC);
 
 -- 8-2. 댓글 테이블
 -- 근거: app/schemas/community.py:126-141 (CommentResponse)
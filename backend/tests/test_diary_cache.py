@@ -0,0 +1,95 @@
+"""
+아이별 일지 다이제스트 캐시 테스트
+- 메모리 저장소 만료 항목 정리
+- tz-aware/naive created_at 이 섞여도 최근 기간 필터와 최신순 정렬이 시각 기준으로 동작
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.llm import diary_cache as diary_cache_module
+from app.llm.diary_cache import DiaryDigestCache, _MemoryStore
+from app.models import EtcRecord, Record, RecordTypeEnum
+
+KST = timezone(timedelta(hours=9))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(diary_cache_module.time, "monotonic", fake)
+    return fake
+
+
+def _record(record_id: int, created_at: datetime, kid_id: int = 1) -> Record:
+    return Record(
+        id=record_id,
+        kid_id=kid_id,
+        record_type=RecordTypeEnum.ETC,
+        record_date=created_at.date(),
+        created_at=created_at,
+        etc_record=EtcRecord(title=f"기록 {record_id}"),
+    )
+
+
+def test_memory_store_sweeps_entries_never_read_again(clock):
+    store = _MemoryStore(ttl_seconds=60)
+    for kid_id in range(100):
+        store.set(kid_id, {"day": "x"})
+    assert len(store) == 100
+
+    clock.now += 61
+    store.set(1000, {"day": "x"})
+
+    assert len(store) == 1
+    assert store.get(1000) == {"day": "x"}
+
+
+def test_memory_store_sweep_keeps_live_entries(clock):
+    store = _MemoryStore(ttl_seconds=60)
+    store.set(1, {"day": "x"})
+    clock.now += 30
+    store.set(2, {"day": "x"})
+    clock.now += 31
+    store.set(3, {"day": "x"})
+
+    assert store.get(1) is None
+    assert store.get(2) == {"day": "x"}
+    assert len(store) == 2
+
+
+def test_recent_lines_compare_aware_datetimes():
+    cache = DiaryDigestCache(days=7, capacity=10, store=_MemoryStore(ttl_seconds=60))
+    now = datetime.now(timezone.utc)
+    # KST 로 보면 문자열상 최근처럼 보이지만 실제로는 7일 + 1시간 전
+    old_kst = (now - timedelta(days=7, hours=1)).astimezone(KST)
+    recent_naive = (now - timedelta(hours=1)).replace(tzinfo=None)
+    entry = cache.build(1, None, [_record(2, recent_naive), _record(1, old_kst)])
+
+    lines = cache.recent_lines(entry, days=7, limit=10)
+
+    assert len(lines) == 1
+    assert "기록 2" in lines[0]
+
+
+def test_record_saved_orders_by_instant():
+    cache = DiaryDigestCache(days=7, capacity=10, store=_MemoryStore(ttl_seconds=60))
+    now = datetime.now(timezone.utc)
+    first = _record(1, now - timedelta(hours=2))
+    cache.build(1, first, [first])
+
+    # 오프셋이 달라 문자열로는 더 이른 값이지만 실제로는 더 최근 기록
+    later = _record(2, (now - timedelta(hours=1)).astimezone(timezone(timedelta(hours=-5))))
+    cache.record_saved(later)
+    entry = cache.get(1)
+
+    assert [item[0] for item in entry["records"]] == [2, 1]
+    assert entry["latest"][0] == 2
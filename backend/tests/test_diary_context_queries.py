@@ -0,0 +1,186 @@
+"""
+DiaryContextBuilder 일지 조회 쿼리 수 회귀 테스트
+- 다이제스트 적재 시 쿼리 수 = 기록 목록 1회 + 목록에 있는 기록 타입 수 (기록 건수와 무관, N+1 방지)
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.llm import diary_cache as diary_cache_module
+from app.llm.service import DiaryContextBuilder
+from app.models import (
+    Base,
+    DiaperRecord,
+    EtcRecord,
+    Kid,
+    MealRecord,
+    MealTypeEnum,
+    Record,
+    RecordTypeEnum,
+    SleepRecord,
+    SleepTypeEnum,
+    User,
+)
+
+# ARRAY 컬럼이 있는 growth/health 는 SQLite 에서 만들 수 없으므로 제외
+TABLES = [
+    User.__table__,
+    Kid.__table__,
+    Record.__table__,
+    SleepRecord.__table__,
+    MealRecord.__table__,
+    DiaperRecord.__table__,
+    EtcRecord.__table__,
+]
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements.clear()
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=TABLES)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def digest_store(monkeypatch):
+    """테스트마다 빈 메모리 저장소 사용 (Redis/이전 테스트 항목 영향 배제)"""
+    cache = diary_cache_module.diary_digest_cache
+    monkeypatch.setattr(cache, "store", diary_cache_module._MemoryStore(ttl_seconds=60))
+    return cache
+
+
+@pytest.fixture
+def kid(db):
+    user = User(username="parent", password_hash="x")
+    kid = Kid(user=user, name="김하늘", birth_date=date(2024, 1, 1))
+    db.add_all([user, kid])
+    db.commit()
+    return kid
+
+
+def _add_sleep(db, kid, created_at):
+    start = created_at - timedelta(hours=2)
+    db.add(Record(
+        kid_id=kid.id,
+        record_type=RecordTypeEnum.SLEEP,
+        record_date=created_at.date(),
+        created_at=created_at,
+        sleep_record=SleepRecord(sleep_type=SleepTypeEnum.NAP, start_datetime=start, end_datetime=created_at),
+    ))
+
+
+def _add_meal(db, kid, created_at):
+    db.add(Record(
+        kid_id=kid.id,
+        record_type=RecordTypeEnum.MEAL,
+        record_date=created_at.date(),
+        created_at=created_at,
+        meal_record=MealRecord(meal_datetime=created_at, meal_type=MealTypeEnum.FORMULA, amount_ml=120),
+    ))
+
+
+def _fresh_builder(db, kid) -> DiaryContextBuilder:
+    # 적재한 세션의 identity map 을 비워 상세 관계가 실제로 조회되게 함
+    db.expire_all()
+    db.refresh(kid)
+    return DiaryContextBuilder(kid, db)
+
+
+def test_recent_digest_queries_once_per_record_type(engine, db, kid):
+    now = datetime.utcnow()
+    for i in range(5):
+        _add_sleep(db, kid, now - timedelta(hours=3 * i + 1))
+        _add_meal(db, kid, now - timedelta(hours=3 * i + 2))
+    db.commit()
+    builder = _fresh_builder(db, kid)
+
+    with QueryCounter(engine) as counter:
+        digest = builder.recent_digest()
+
+    assert counter.count == 1 + 2, counter.statements
+    assert len(digest.splitlines()) == 10
+    assert "수면 nap" in digest and "식사 formula" in digest
+
+
+def test_query_count_does_not_grow_with_records(engine, db, kid):
+    now = datetime.utcnow()
+    for i in range(30):
+        _add_sleep(db, kid, now - timedelta(hours=i + 1))
+    db.commit()
+    builder = _fresh_builder(db, kid)
+
+    with QueryCounter(engine) as counter:
+        builder.recent_digest()
+
+    assert counter.count == 1 + 1, counter.statements
+
+
+def test_latest_record_reuses_recent_query(engine, db, kid):
+    now = datetime.utcnow()
+    _add_sleep(db, kid, now - timedelta(hours=2))
+    _add_meal(db, kid, now - timedelta(hours=1))
+    db.commit()
+    builder = _fresh_builder(db, kid)
+
+    with QueryCounter(engine) as counter:
+        latest = builder.latest_record()
+
+    assert counter.count == 1 + 2, counter.statements
+    assert "[meal]" in latest
+
+
+def test_latest_record_outside_window(engine, db, kid):
+    """최근 기간에 기록이 없으면 최신 기록 1건을 따로 조회 (목록 1 + 최신 1 + 상세 1)"""
+    _add_sleep(db, kid, datetime.utcnow() - timedelta(days=30))
+    db.commit()
+    builder = _fresh_builder(db, kid)
+
+    with QueryCounter(engine) as counter:
+        latest = builder.latest_record()
+
+    assert counter.count == 3, counter.statements
+    assert "[sleep]" in latest
+
+
+def test_cached_digest_skips_database(engine, db, kid):
+    _add_meal(db, kid, datetime.utcnow() - timedelta(hours=1))
+    db.commit()
+    builder = _fresh_builder(db, kid)
+    builder.recent_digest()
+
+    with QueryCounter(engine) as counter:
+        builder.recent_digest()
+        builder.latest_record()
+
+    assert counter.count == 0, counter.statements
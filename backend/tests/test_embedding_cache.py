@@ -0,0 +1,57 @@
+"""
+쿼리 임베딩 캐시 테스트
+"""
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from app.llm.embedding_cache import CachedQueryEmbeddings, cache_key
+
+
+class RecordingEmbeddings(Embeddings):
+    def __init__(self):
+        self.queries: List[str] = []
+
+    def embed_query(self, text: str) -> List[float]:
+        self.queries.append(text)
+        return [float(len(self.queries))]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [[0.0] for _ in texts]
+
+
+class DictTier:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, vector):
+        self.data[key] = vector
+
+
+def test_miss_embeds_original_text():
+    inner = RecordingEmbeddings()
+    cached = CachedQueryEmbeddings(inner, model="m")
+
+    cached.embed_query("  Baby  RSV 증상은? ")
+
+    assert inner.queries == ["  Baby  RSV 증상은? "]
+
+
+def test_normalized_variants_share_entry():
+    inner = RecordingEmbeddings()
+    cached = CachedQueryEmbeddings(inner, model="m", remote=DictTier())
+
+    first = cached.embed_query("RSV 증상은?")
+    second = cached.embed_query("  rsv   증상은?")
+
+    assert first == second
+    assert inner.queries == ["RSV 증상은?"]
+    assert cached.stats()["memory_hits"] == 1
+
+
+def test_key_depends_on_model():
+    assert cache_key("a", "질문") != cache_key("b", "질문")
+    assert cache_key("a", "질문 ") == cache_key("a", " 질문")
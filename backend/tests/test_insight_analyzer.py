@@ -0,0 +1,59 @@
+"""
+RecordAnalyzer 컬럼 변환 테스트
+- PostgreSQL timestamptz 는 tz-aware datetime 으로 오므로 그대로 넣어도 수면 시간이 계산돼야 함
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from app.llm.insight_service import RecordAnalyzer
+from app.models import MealTypeEnum, RecordTypeEnum, SleepTypeEnum
+
+KST = timezone(timedelta(hours=9))
+
+
+def _row(record_type, **fields):
+    # window_query 의 컬럼 순서와 동일
+    names = [
+        "record_type", "record_date",
+        "sleep_id", "sleep_type", "start", "end",
+        "meal_id", "meal_type", "amount_ml",
+        "diaper_id", "diaper_type", "condition",
+        "health_id", "symptoms", "medicines",
+        "growth_id", "height_cm", "weight_kg", "activities",
+        "etc_id", "etc_title",
+    ]
+    values = {"record_type": record_type, "record_date": date(2026, 10, 17), **fields}
+    return tuple(values.get(name) for name in names)
+
+
+def test_sleep_hours_from_tz_aware_datetimes():
+    rows = [
+        _row(
+            RecordTypeEnum.SLEEP,
+            sleep_id=1,
+            sleep_type=SleepTypeEnum.NAP,
+            start=datetime(2026, 10, 17, 13, 0, tzinfo=KST),
+            end=datetime(2026, 10, 17, 15, 20, tzinfo=KST),
+        ),
+        # 자정을 넘기며 오프셋이 다른 값이 섞여도 절대 시간 차이로 계산
+        _row(
+            RecordTypeEnum.SLEEP,
+            sleep_id=2,
+            sleep_type=SleepTypeEnum.NIGHT,
+            start=datetime(2026, 10, 16, 21, 0, tzinfo=KST),
+            end=datetime(2026, 10, 16, 22, 30, tzinfo=timezone.utc),
+        ),
+        _row(RecordTypeEnum.MEAL, meal_id=3, meal_type=MealTypeEnum.FORMULA, amount_ml=120),
+    ]
+
+    cols = RecordAnalyzer._columnar(rows)
+
+    assert cols["sleep_hours"][:2].tolist() == [2.33, 10.5]
+    assert np.isnan(cols["sleep_hours"][2])
+    assert cols["amount_ml"][2] == 120
+
+
+def test_empty_window():
+    cols = RecordAnalyzer._columnar([])
+    assert cols["sleep_hours"].size == 0
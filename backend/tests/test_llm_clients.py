@@ -0,0 +1,38 @@
+"""
+LLM 클라이언트 레지스트리 테스트
+"""
+import pytest
+
+from app.core.config import settings
+from app.llm import clients
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(clients, "_chat_models", {})
+
+
+def test_same_settings_share_instance():
+    assert clients.get_chat_model(temperature=0.0) is clients.get_chat_model(temperature=0.0)
+
+
+def test_timeout_is_part_of_key_and_applied():
+    default = clients.get_chat_model(temperature=0.0)
+    short = clients.get_chat_model(temperature=0.0, timeout=5.0)
+
+    assert short is not default
+    assert short.request_timeout == 5.0
+    assert default.request_timeout == settings.llm_timeout_seconds
+    assert clients.get_chat_model(temperature=0.0, timeout=settings.llm_timeout_seconds) is default
+
+
+def test_first_model_creates_shared_http_clients(monkeypatch):
+    # 공유 HTTP 클라이언트가 아직 없을 때도 잠금 재진입 없이 생성되어야 함
+    monkeypatch.setattr(clients, "_sync_client", None)
+    monkeypatch.setattr(clients, "_async_client", None)
+
+    llm = clients.get_chat_model(temperature=0.3)
+
+    assert llm.http_client is clients._sync_client is not None
+    assert llm.http_async_client is clients._async_client is not None
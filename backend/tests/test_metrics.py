@@ -0,0 +1,33 @@
+"""
+/metrics 접근 제어 테스트
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import create_app
+
+
+@pytest.fixture
+def client():
+    # lifespan(예열/큐 시작)은 실행하지 않음
+    return TestClient(create_app())
+
+
+def test_metrics_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", None)
+
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"X-Metrics-Token": ""}).status_code == 404
+
+
+def test_metrics_requires_matching_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "secret")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"X-Metrics-Token": "wrong"}).status_code == 404
+
+    res = client.get("/metrics", headers={"X-Metrics-Token": "secret"})
+    assert res.status_code == 200
+    assert set(res.json()["db_pool"]) == {"sync", "async"}
@@ -0,0 +1,79 @@
+"""
+빌드된 모드 인덱스 문서 저장소 테스트
+- index_builder 가 쓴 JSONL + 오프셋 파일을 mmap 으로 열어 위치별로 문서를 읽는지 확인
+"""
+import faiss
+import numpy as np
+import pytest
+
+from app.llm import vector_loader
+from app.llm.index_builder import _encode_docstore
+from app.llm.vector_loader import (
+    DOCSTORE_OFFSETS_SUFFIX,
+    DOCSTORE_SUFFIX,
+    INDEX_SUFFIX,
+    MmapDocstore,
+    load_prebuilt_store,
+)
+
+DOCUMENTS = [
+    {"id": "a", "page_content": "신생아 수면 시간은 하루 14~17시간", "metadata": {"source": "sleep.pdf"}},
+    {"id": "b", "page_content": "이유식은 생후 4~6개월에 시작", "metadata": {}},
+    {"id": "c", "page_content": "38도 이상 발열 시 진료 권장", "metadata": {"source": "fever.pdf", "page": 3}},
+]
+
+
+def _write_prebuilt(index_dir, mode="mom", documents=DOCUMENTS):
+    vectors = np.eye(len(documents), 4, dtype="float32")
+    index = faiss.IndexFlatL2(4)
+    index.add(vectors)
+    faiss.write_index(index, str(index_dir / f"{mode}{INDEX_SUFFIX}"))
+    docs_bytes, offsets_bytes = _encode_docstore(documents)
+    (index_dir / f"{mode}{DOCSTORE_SUFFIX}").write_bytes(docs_bytes)
+    (index_dir / f"{mode}{DOCSTORE_OFFSETS_SUFFIX}").write_bytes(offsets_bytes)
+    return vectors
+
+
+@pytest.fixture(autouse=True)
+def no_embeddings(monkeypatch):
+    # 벡터로 직접 검색하므로 임베딩 클라이언트는 필요 없음
+    monkeypatch.setattr(vector_loader, "get_embeddings", lambda: None)
+
+
+def test_docstore_reads_documents_by_position(tmp_path):
+    _write_prebuilt(tmp_path)
+    store = MmapDocstore(tmp_path / f"mom{DOCSTORE_SUFFIX}", tmp_path / f"mom{DOCSTORE_OFFSETS_SUFFIX}")
+
+    assert len(store) == 3
+    doc = store.search("2")
+    assert doc.page_content == DOCUMENTS[2]["page_content"]
+    assert doc.metadata == {"source": "fever.pdf", "page": 3}
+    assert store.search("3") == "ID 3 not found."
+    assert store.search("a") == "ID a not found."
+
+
+def test_prebuilt_store_search(tmp_path):
+    vectors = _write_prebuilt(tmp_path)
+
+    store = load_prebuilt_store(tmp_path, "mom")
+    docs = store.similarity_search_by_vector(vectors[1].tolist(), k=2)
+
+    assert docs[0].page_content == DOCUMENTS[1]["page_content"]
+    assert len(docs) == 2
+
+
+def test_mismatched_offsets_are_ignored(tmp_path):
+    _write_prebuilt(tmp_path)
+    # 재빌드 도중처럼 문서 파일만 바뀐 상태
+    (tmp_path / f"mom{DOCSTORE_SUFFIX}").write_bytes(_encode_docstore(DOCUMENTS[:2])[0])
+
+    assert load_prebuilt_store(tmp_path, "mom") is None
+
+
+def test_empty_docstore(tmp_path):
+    docs_bytes, offsets_bytes = _encode_docstore([])
+    (tmp_path / f"mom{DOCSTORE_SUFFIX}").write_bytes(docs_bytes)
+    (tmp_path / f"mom{DOCSTORE_OFFSETS_SUFFIX}").write_bytes(offsets_bytes)
+
+    store = MmapDocstore(tmp_path / f"mom{DOCSTORE_SUFFIX}", tmp_path / f"mom{DOCSTORE_OFFSETS_SUFFIX}")
+    assert len(store) == 0
@@ -0,0 +1,57 @@
+"""
+비개인화 답변 시맨틱 캐시 테스트
+"""
+import time
+
+from app.llm.response_cache import SemanticResponseCache
+
+KEY = ("in_scope", "doctor", False, "v1")
+PAYLOAD = {"output": "38도 이상이면 해열제를 고려하세요", "tools_called": ["rag_search"], "rag_used": True}
+
+
+def _cache(**overrides) -> SemanticResponseCache:
+    options = {"threshold": 0.95, "ttl_seconds": 60, "max_entries": 2, **overrides}
+    return SemanticResponseCache(**options)
+
+
+def test_similar_question_hits():
+    cache = _cache()
+    cache.store(KEY, [1.0, 0.0, 0.0], PAYLOAD)
+
+    assert cache.lookup(KEY, [0.99, 0.05, 0.0]) == PAYLOAD
+    assert cache.lookup(KEY, [0.5, 0.5, 0.0]) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_routing_is_part_of_key():
+    cache = _cache()
+    cache.store(KEY, [1.0, 0.0, 0.0], PAYLOAD)
+
+    assert cache.lookup(("in_scope", "doctor", True, "v1"), [1.0, 0.0, 0.0]) is None
+
+
+def test_new_index_version_drops_old_entries():
+    cache = _cache()
+    cache.store(KEY, [1.0, 0.0, 0.0], PAYLOAD)
+
+    assert cache.lookup(("in_scope", "doctor", False, "v2"), [1.0, 0.0, 0.0]) is None
+    assert cache.lookup(KEY, [1.0, 0.0, 0.0]) is None
+    assert cache.stats()["invalidated"] == 1
+
+
+def test_expired_entries_are_not_served(monkeypatch):
+    cache = _cache()
+    cache.store(KEY, [1.0, 0.0, 0.0], PAYLOAD)
+    now = time.time()
+    monkeypatch.setattr("app.llm.response_cache.time.time", lambda: now + 61)
+
+    assert cache.lookup(KEY, [1.0, 0.0, 0.0]) is None
+
+
+def test_bucket_keeps_newest_entries():
+    cache = _cache()
+    for i in range(3):
+        cache.store(KEY, [float(i == j) for j in range(3)], {"output": str(i)})
+
+    assert cache.lookup(KEY, [1.0, 0.0, 0.0]) is None
+    assert cache.lookup(KEY, [0.0, 0.0, 1.0]) == {"output": "2"}
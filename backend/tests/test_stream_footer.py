@@ -0,0 +1,85 @@
+"""
+스트리밍 응답 출처 줄 제거 테스트
+- token 이벤트를 이어 붙인 본문이 done 의 output(_strip_source_footer 적용)과 같아야 함
+"""
+import asyncio
+
+import pytest
+
+from app.llm import service
+from app.llm.service import _FooterStreamFilter, _strip_source_footer
+
+RAW = (
+    "열이 38도 이상이면 해열제를 고려하세요.\n"
+    "참고로 수분 섭취도 중요해요.\n"
+    "\n"
+    "📚 참고: [소아 발열 가이드]\n"
+    "  참고: [대한소아과학회]\n"
+    "참고"
+)
+
+
+def _chunks(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _run_filter(chunks) -> str:
+    footer_filter = _FooterStreamFilter()
+    return "".join(footer_filter.feed(c) for c in chunks) + footer_filter.flush()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_filter_matches_strip_source_footer(size):
+    streamed = _run_filter(_chunks(RAW, size))
+
+    assert streamed.strip() == _strip_source_footer(RAW)
+    assert "소아 발열 가이드" not in streamed
+
+
+def test_filter_does_not_hold_back_regular_text():
+    footer_filter = _FooterStreamFilter()
+
+    assert footer_filter.feed("열이") == "열이"
+    assert footer_filter.feed(" 나요\n참") == " 나요\n"
+    assert footer_filter.feed("고로") == "참고로"
+
+
+class FakeExecutor:
+    def __init__(self, text: str):
+        self.text = text
+
+    async def astream_events(self, agent_input, version):
+        for piece in _chunks(self.text, 4):
+            yield {"event": "on_chat_model_stream", "name": "ChatOpenAI", "data": {"chunk": FakeChunk(piece)}}
+        yield {"event": "on_chain_end", "name": "AgentExecutor", "data": {"output": {"output": self.text}}}
+
+
+class FakeChunk:
+    def __init__(self, content: str):
+        self.content = content
+
+
+def test_stream_response_tokens_match_done_output(monkeypatch):
+    async def fake_prepare_turn(*args, **kwargs):
+        return {
+            "mode": "doctor",
+            "decision": "in_scope",
+            "target": "doctor",
+            "suggest_mom_note": False,
+            "kid_info_used": False,
+            "routing": {"decision": "in_scope", "target": "doctor"},
+            "executor": FakeExecutor(RAW),
+            "agent_input": {},
+        }
+
+    monkeypatch.setattr(service, "_prepare_turn", fake_prepare_turn)
+
+    async def collect():
+        return [e async for e in service.stream_response("열이 나요", "doctor", [])]
+
+    events = asyncio.run(collect())
+    streamed = "".join(e["data"]["text"] for e in events if e["event"] == "token")
+    done = events[-1]
+
+    assert done["event"] == "done"
+    assert streamed.strip() == done["data"]["output"]
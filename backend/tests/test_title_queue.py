@@ -0,0 +1,21 @@
+"""
+채팅 세션 제목 테스트
+"""
+from app.llm.title_queue import TITLE_MAX_LENGTH, _parse_titles, fallback_title
+
+
+def test_fallback_title_keeps_list_length_limit():
+    message = "우리 아이가 밤에 자꾸 깨서 우는데 수면 교육을 언제부터 어떻게 시작하면 좋을지 궁금해요"
+
+    title = fallback_title(f"  {message}")
+
+    assert len(title) == TITLE_MAX_LENGTH == 40
+    assert title == message[:40]
+
+
+def test_parse_titles_truncates_and_checks_count():
+    content = '결과: ["수면 교육 시기", "' + "가" * 50 + '"]'
+
+    assert _parse_titles(content, 2) == ["수면 교육 시기", "가" * 40]
+    assert _parse_titles(content, 3) is None
+    assert _parse_titles("제목 없음", 1) is None
@@ -24,6 +24,51 @@ export async function sendAiMessage({ mode, message, history = [], kidId = null,
   return res.json(); // { reply: string }
 }
 
+// SSE 스트리밍 채팅: onEvent(event, data) 로 routing/tool/token/done/error 이벤트 전달
+export async function streamAiMessage(
+  { mode, message, history = [], kidId = null, sessionId = null },
+  onEvent,
+) {
+  const res = await apiFetch('/api/ai/chat/stream', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', ...getAuthHeaders() },
+    body: JSON.stringify({
+      mode,
+      message,
+      history,
+      kid_id: kidId,
+      session_id: sessionId,
+    }),
+  });
+  if (!res.ok || !res.body) {
+    const text = await res.text();
+    throw new Error(text || 'AI 요청 실패');
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let final = null;
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const chunks = buffer.split('\n\n');
+    buffer = chunks.pop();
+    for (const chunk of chunks) {
+      const eventLine = chunk.split('\n').find((l) => l.startsWith('event: '));
+      const dataLine = chunk.split('\n').find((l) => l.startsWith('data: '));
+      if (!eventLine || !dataLine) continue;
+      const event = eventLine.slice(7);
+      const data = JSON.parse(dataLine.slice(6));
+      if (event === 'done') final = data;
+      if (event === 'error') throw new Error(data.detail || 'AI 요청 실패');
+      onEvent?.(event, data);
+    }
+  }
+  return final; // /api/ai/chat 응답과 동일한 형태
+}
+
 export async function listAiSessions() {
   const res = await apiFetch('/api/ai/sessions', {
     headers: { ...getAuthHeaders() },